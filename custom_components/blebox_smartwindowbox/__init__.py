@@ -1,33 +1,142 @@
 from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.typing import ConfigType
 
-from .api import BleBoxSmartWindowBoxApi
-from .const import DOMAIN, PLATFORMS
+from .api import BleBoxSmartWindowBoxApi, BleBoxApiError
+from .batch import MOVE_WINDOWS_SCHEMA, SERVICE_MOVE_WINDOWS, async_move_windows
+from .cache import StateCache
+from .connection import DeviceConnection
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    DATA_SCHEDULER,
+    CONF_RAIN_INTERVAL,
+    CONF_RAIN_CLOSE_CHANNELS,
+    DEFAULT_RAIN_INTERVAL_SEC,
+)
 from .coordinator import BleBoxCoordinator
+from .entity import device_identifiers
+from .metrics import TransportMetrics
+from .rain import RainWatcher
+from .travel_model import TravelModel
+from .usage import UsageStats
+from .scheduler import PollScheduler
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async def _move_windows(call: ServiceCall) -> ServiceResponse:
+        return await async_move_windows(hass, call)
+
+    # Domain-level: spans every configured box
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MOVE_WINDOWS,
+        _move_windows,
+        schema=MOVE_WINDOWS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    session = async_get_clientsession(hass)
-    api = BleBoxSmartWindowBoxApi(session=session, host=entry.data["host"])
+    metrics = TransportMetrics()
+    connection = DeviceConnection(metrics)
+    api = BleBoxSmartWindowBoxApi(session=connection.session, host=entry.data["host"], metrics=metrics)
+
+    async def _close_connection(event: Event | None = None) -> None:
+        await connection.async_close()
+
+    entry.async_on_unload(_close_connection)
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _close_connection))
+
+    scheduler: PollScheduler = hass.data.setdefault(DATA_SCHEDULER, PollScheduler())
+    scheduler.register(entry.entry_id)
 
-    coordinator = BleBoxCoordinator(hass, api)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = BleBoxCoordinator(hass, api, scheduler, entry.entry_id)
+    await coordinator.travel.async_load()
+    await coordinator.usage.async_load()
+    # With a cached state entities come up right away; the live refresh follows in the background
+    restored = await coordinator.async_restore()
+    if not restored:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            scheduler.unregister(entry.entry_id)
+            raise
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "api": api,
+        "connection": connection,
         "coordinator": coordinator,
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    rain = RainWatcher(
+        hass,
+        entry,
+        coordinator,
+        entry.options.get(CONF_RAIN_INTERVAL, DEFAULT_RAIN_INTERVAL_SEC),
+        [int(ch) for ch in entry.options.get(CONF_RAIN_CLOSE_CHANNELS, [])],
+        scheduler,
+    )
+    rain.start()
+    entry.async_on_unload(rain.async_stop)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    task = hass.async_create_background_task(
+        _async_start_live(hass, entry, coordinator, restored), f"{DOMAIN} {entry.title} live start"
+    )
+    entry.async_on_unload(task.cancel)
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_start_live(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: BleBoxCoordinator, restored: bool
+) -> None:
+    if restored:
+        await coordinator.async_refresh()
+    try:
+        device = await coordinator.async_update_device_info()
+    except BleBoxApiError:
+        return  # keep the cached firmware/hardware info; retried on the next setup
+    dev_reg = dr.async_get(hass)
+    if dev := dev_reg.async_get_device(identifiers=device_identifiers(entry)):
+        dev_reg.async_update_device(
+            dev.id,
+            sw_version=str(device.fw) if device.fw is not None else None,
+            hw_version=str(device.hw) if device.hw is not None else None,
+        )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
-    return unload_ok
\ No newline at end of file
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data:
+            await data["coordinator"].async_shutdown()
+        scheduler: PollScheduler | None = hass.data.get(DATA_SCHEDULER)
+        if scheduler is not None:
+            scheduler.unregister(entry.entry_id)
+            if not len(scheduler):
+                hass.data.pop(DATA_SCHEDULER)
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # Learned travel profiles, usage totals and the cached state belong to this device only
+    await TravelModel(hass, entry.entry_id).async_remove()
+    await UsageStats(hass, entry.entry_id).async_remove()
+    await StateCache(hass, entry.entry_id).async_remove()
@@ -1,16 +1,49 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from typing import Any
 
 import aiohttp
 
+from .const import (
+    CMD_STOP,
+    CMD_NEXT,
+    PROBE_TIMEOUT_SEC,
+    READ_TIMEOUT_MIN_SEC,
+    CONNECT_TIMEOUT_MIN_SEC,
+    HEDGE_DELAY_MIN_SEC,
+    HEDGE_MIN_SAMPLES,
+)
+from .health import HEALTH_HEALTHY, HEALTH_OFFLINE, DeviceHealth
+from .metrics import TransportMetrics
+
+# Request priorities (lower goes first)
+PRIORITY_COMMAND = 0
+PRIORITY_READ = 1
+
 
 class BleBoxApiError(Exception):
     """Raised on any API/transport error."""
 
 
+class DeviceOfflineError(BleBoxApiError):
+    """Raised without touching the network while the device is known to be offline."""
+
+
+class BleBoxHttpError(BleBoxApiError):
+    """The device answered, but with an HTTP error status (e.g. an endpoint its firmware lacks)."""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
 @dataclass
 class DeviceInfo:
     device_name: str
@@ -22,30 +55,262 @@ class DeviceInfo:
     ip: str | None
 
 
+class _PriorityGate:
+    """
+    Lets one request onto the wire at a time, like a lock, but hands the
+    slot to waiting commands before waiting reads (FIFO within a priority).
+    """
+
+    def __init__(self) -> None:
+        self._busy = False
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.holder: int | None = None  # priority of the current holder
+
+    def waiting(self, priority: int) -> bool:
+        return any(p == priority and not fut.done() for p, _, fut in self._waiters)
+
+    async def acquire(self, priority: int) -> None:
+        if not self._busy:
+            self._busy = True
+            self.holder = priority
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                # Slot was handed over just as we got cancelled: pass it on
+                self.release()
+            raise
+        self.holder = priority
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # ownership passes directly, _busy stays set
+                return
+        self._busy = False
+        self.holder = None
+
+
 class BleBoxSmartWindowBoxApi:
-    def __init__(self, session: aiohttp.ClientSession, host: str, timeout: float = 8.0) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        timeout: float = 8.0,
+        preempt_reads: bool = True,
+        metrics: TransportMetrics | None = None,
+        connect_timeout: float | None = None,
+        hedge_reads: bool = True,
+    ) -> None:
         self._session = session
         self._host = host.rstrip("/")
-        self._timeout = aiohttp.ClientTimeout(total=timeout)
-        self._lock = asyncio.Lock()
+        # Ceiling of the adaptive timeouts, and the timeout until round trips are measured
+        self._timeout_max = timeout
+        self._connect_timeout = connect_timeout  # fixed connect budget instead of the measured one
+        self.health = DeviceHealth()
+        self._gate = _PriorityGate()
+        # Abandon an in-flight read when a STOP is waiting for the slot
+        self._preempt_reads = preempt_reads
+        # Send a second copy of a state read that runs long; the first answer wins
+        self._hedge_reads = hedge_reads
+        self._active_read: asyncio.Task | None = None
+        self._read_preempted = False
+        # Single-flight reads: path -> in-flight request / last result
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._recent: dict[str, tuple[float, Any]] = {}
+        self.metrics = metrics or TransportMetrics()
 
     @property
     def base_url(self) -> str:
         return f"http://{self._host}"
 
-    async def _get_json(self, path: str) -> Any:
+    async def _request(self, path: str, retry_stale: bool = True) -> Any:
         url = f"{self.base_url}{path}"
         try:
-            async with self._lock:
-                async with self._session.get(url, timeout=self._timeout) as resp:
-                    if resp.status != 200:
-                        raise BleBoxApiError(f"GET {path} failed: HTTP {resp.status}")
-                    return await resp.json(content_type=None)
+            return await self._request_once(url, path)
+        except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as e:
+            # A kept-alive socket the device already dropped fails like this before
+            # the request is processed; retry once on a fresh connection.
+            if not retry_stale or isinstance(e, aiohttp.ClientConnectorError):
+                raise
+            self.metrics.stale_retries += 1
+            return await self._request_once(url, path)
+
+    def _client_timeout(self, path: str) -> aiohttp.ClientTimeout:
+        """
+        Separate connect and read budgets, each srtt + 4 * rttvar of what was measured
+        (connects, resp. this endpoint), so a lost packet costs about one round-trip
+        budget instead of the full timeout. A device that just failed gets a lower ceiling.
+        """
+        ceiling = self._timeout_max
+        if self.health.state != HEALTH_HEALTHY:
+            ceiling = min(ceiling, PROBE_TIMEOUT_SEC)
+        read = self.metrics.rtt_for(path).timeout(READ_TIMEOUT_MIN_SEC, ceiling)
+        connect = self._connect_timeout or self.metrics.connect_rtt.timeout(CONNECT_TIMEOUT_MIN_SEC, ceiling)
+        return aiohttp.ClientTimeout(total=connect + read, sock_connect=connect, sock_read=read)
+
+    async def _request_once(self, url: str, path: str) -> Any:
+        async with self._session.get(url, timeout=self._client_timeout(path)) as resp:
+            if resp.status != 200:
+                raise BleBoxHttpError(f"GET {path} failed: HTTP {resp.status}", resp.status)
+            return await resp.json(content_type=None)
+
+    async def _timed_request(self, path: str, wait_s: float, retry_stale: bool = True) -> Any:
+        started = time.monotonic()
+        try:
+            data = await self._request(path, retry_stale)
+        except asyncio.TimeoutError:
+            self.metrics.record_request(path, wait_s, None, "timeout")
+            raise
+        except (aiohttp.ClientError, BleBoxApiError) as e:
+            self.metrics.record_request(path, wait_s, time.monotonic() - started, type(e).__name__)
+            raise
+        self.metrics.record_request(path, wait_s, time.monotonic() - started)
+        return data
+
+    async def _health_checked(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Report the outcome of one logical request to the breaker (a hedged pair counts once).
+        Takes a factory: a coroutine created outside would never run if this is cancelled first.
+        """
+        try:
+            data = await request()
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            self.health.record_failure()
+            raise
+        except BleBoxApiError:
+            # An HTTP error status still means the device is reachable
+            self.health.record_success()
+            raise
+        except asyncio.CancelledError:
+            self.health.record_abandoned()
+            raise
+        self.health.record_success()
+        return data
+
+    async def _get_json(
+        self,
+        path: str,
+        priority: int = PRIORITY_READ,
+        preempt: bool = False,
+        retry_stale: bool = True,
+        force: bool = False,
+    ) -> Any:
+        # Offline: fail without queueing; only a read may go out, as the periodic probe.
+        # force skips the breaker for requests that must always be tried (STOP).
+        if not force and not self.health.allow(probe=priority == PRIORITY_READ):
+            raise DeviceOfflineError(
+                f"{self._host} is offline (next connection attempt in {self.health.probe_in:.0f} s)"
+            )
+        probe = self.health.state == HEALTH_OFFLINE and not force
+        try:
+            while True:
+                if preempt and self._preempt_reads and self._gate.holder == PRIORITY_READ:
+                    self._preempt_active_read()
+                queued = time.monotonic()
+                await self._gate.acquire(priority)
+                wait_s = time.monotonic() - queued
+                try:
+                    if priority != PRIORITY_READ:
+                        return await self._health_checked(functools.partial(self._timed_request, path, wait_s, retry_stale))
+
+                    self._read_preempted = False
+                    hedge_delay = self._hedge_delay(path)
+                    if hedge_delay is None:
+                        read = functools.partial(self._timed_request, path, wait_s)
+                    else:
+                        read = functools.partial(self._hedged_read, path, wait_s, hedge_delay)
+                    self._active_read = asyncio.ensure_future(self._health_checked(read))
+                    try:
+                        return await self._active_read
+                    except asyncio.CancelledError:
+                        if not self._read_preempted:
+                            raise
+                        # Abandoned for a STOP: queue up again behind it
+                    finally:
+                        self._active_read = None
+                finally:
+                    self._gate.release()
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             raise BleBoxApiError(f"GET {path} failed: {e}") from e
+        finally:
+            if probe:
+                # Cancelled while queued, or a garbled answer: the probe slot must not stay taken
+                self.health.record_abandoned()
+
+    def _hedge_delay(self, path: str) -> float | None:
+        if not self._hedge_reads or self.health.state != HEALTH_HEALTHY:
+            return None
+        return self.metrics.rtt_for(path).hedge_delay(HEDGE_DELAY_MIN_SEC, HEDGE_MIN_SAMPLES)
+
+    async def _hedged_read(self, path: str, wait_s: float, delay: float) -> Any:
+        """
+        Reads are idempotent: if the answer is late (a lost packet, usually), the
+        same GET goes out again on the spare connection and whichever answers first
+        wins. Still one logical request: both run while this holds the gate slot.
+        """
+        hedge: asyncio.Future | None = None
+        pending = {asyncio.ensure_future(self._timed_request(path, wait_s))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.metrics.hedged_reads += 1
+                hedge = asyncio.ensure_future(self._timed_request(path, 0.0, retry_stale=False))
+                pending.add(hedge)
+            error: BaseException | None = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+                if not pending:
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _preempt_active_read(self) -> None:
+        if self._active_read is not None and not self._active_read.done():
+            self._read_preempted = True
+            self._active_read.cancel()
+
+    async def _get_shared(self, path: str, max_age: float = 0.0) -> Any:
+        """
+        Idempotent GET: concurrent callers share one in-flight request.
+        With max_age > 0 a result that recent is returned without any request.
+        The shared result must be treated as read-only.
+        """
+        if max_age > 0:
+            recent = self._recent.get(path)
+            if recent is not None and time.monotonic() - recent[0] <= max_age:
+                return recent[1]
+
+        fut = self._inflight.get(path)
+        if fut is None:
+            fut = asyncio.ensure_future(self._fetch_shared(path))
+            self._inflight[path] = fut
+        # Shielded: one caller giving up must not cancel the request for the others
+        return await asyncio.shield(fut)
+
+    async def _fetch_shared(self, path: str) -> Any:
+        try:
+            data = await self._get_json(path)
+        finally:
+            self._inflight.pop(path, None)
+        self._recent[path] = (time.monotonic(), data)
+        return data
 
     async def device_state(self) -> DeviceInfo:
-        data = await self._get_json("/api/device/state")
+        data = await self._get_shared("/api/device/state")
         dev = data.get("device", {})
         return DeviceInfo(
             device_name=str(dev.get("deviceName", "")),
@@ -57,8 +322,25 @@ class BleBoxSmartWindowBoxApi:
             ip=dev.get("ip"),
         )
 
-    async def window_extended_state(self) -> dict[str, Any]:
-        return await self._get_json("/api/window/extended/state")
+    async def window_state(self) -> dict[str, Any]:
+        """Compact state (no calibration data); cheap enough for the rain lane."""
+        return await self._get_shared("/api/window/state")
+
+    async def window_extended_state(self, max_age: float = 0.0) -> dict[str, Any]:
+        return await self._get_shared("/api/window/extended/state", max_age)
 
     async def send_motor_command(self, channel: int, command: str) -> dict[str, Any]:
-        return await self._get_json(f"/s/{channel}/{command}")
\ No newline at end of file
+        # Never coalesced: every command must reach the device, ahead of queued reads
+        try:
+            return await self._get_json(
+                f"/s/{channel}/{command}",
+                priority=PRIORITY_COMMAND,
+                preempt=command == CMD_STOP,
+                # A motor must be stoppable even when the breaker has given up on the device
+                force=command == CMD_STOP,
+                # "next step" is not idempotent: never risk sending it twice
+                retry_stale=command != CMD_NEXT,
+            )
+        finally:
+            # Any state fetched before the command is stale now
+            self._recent.clear()
\ No newline at end of file
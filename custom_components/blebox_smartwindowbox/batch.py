@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from itertools import chain, zip_longest
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    MODE_CLOSED_LOOP,
+    MODE_TIMED,
+    BATCH_MAX_PARALLEL_STARTS,
+    EVENT_BATCH_COMPLETED,
+)
+from .coordinator import BleBoxCoordinator
+
+SERVICE_MOVE_WINDOWS = "move_windows"
+
+_POSITION = vol.All(vol.Coerce(int), vol.Range(min=0, max=100))
+
+MOVE_WINDOWS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional("moves"): [
+                vol.Schema({vol.Required("entity_id"): cv.entity_id, vol.Required("position"): _POSITION})
+            ],
+            # Shorthand: the same position for all of these
+            vol.Optional("entity_id"): cv.entity_ids,
+            vol.Optional("position"): _POSITION,
+            vol.Optional("mode", default=MODE_CLOSED_LOOP): vol.In([MODE_CLOSED_LOOP, MODE_TIMED]),
+        }
+    ),
+    cv.has_at_least_one_key("moves", "entity_id"),
+)
+
+
+def _resolve(hass: HomeAssistant, entity_id: str) -> tuple[str, BleBoxCoordinator, int]:
+    """(config entry id, coordinator, channel) behind one of our cover entities."""
+    reg_entry = er.async_get(hass).async_get(entity_id)
+    if reg_entry is None or reg_entry.platform != DOMAIN or reg_entry.domain != "cover":
+        raise HomeAssistantError(f"{entity_id} is not a BleBox smartWindowBox cover")
+    runtime = hass.data.get(DOMAIN, {}).get(reg_entry.config_entry_id)
+    if runtime is None:
+        raise HomeAssistantError(f"{entity_id}: device is not loaded")
+    # unique_id: {entry_id}_motor_{channel}
+    return reg_entry.config_entry_id, runtime["coordinator"], int(reg_entry.unique_id.rsplit("_motor_", 1)[1])
+
+
+async def async_move_windows(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """
+    Move many windows at once. Start commands go out in parallel (at most
+    BATCH_MAX_PARALLEL_STARTS in flight, round-robin over devices so no box
+    waits behind another one's motors); each device then tracks all its moving
+    channels with one shared poll loop.
+    """
+    moves = [(m["entity_id"], m["position"]) for m in call.data.get("moves", [])]
+    if call.data.get("entity_id"):
+        if "position" not in call.data:
+            raise HomeAssistantError("position is required together with entity_id")
+        moves.extend((entity_id, call.data["position"]) for entity_id in call.data["entity_id"])
+    mode = call.data["mode"]
+
+    by_device: dict[str, list[tuple[str, BleBoxCoordinator, int, int]]] = {}
+    for entity_id, target in dict(moves).items():  # the last target per window wins
+        entry_id, coordinator, channel = _resolve(hass, entity_id)
+        by_device.setdefault(entry_id, []).append((entity_id, coordinator, channel, target))
+    ordered = [m for m in chain.from_iterable(zip_longest(*by_device.values())) if m is not None]
+
+    starts = asyncio.Semaphore(BATCH_MAX_PARALLEL_STARTS)
+    t0 = time.monotonic()
+
+    async def _move(entity_id: str, coordinator: BleBoxCoordinator, channel: int, target: int) -> dict[str, Any]:
+        result: dict[str, Any] = {"entity_id": entity_id, "target": target}
+        try:
+            async with starts:
+                req = coordinator.controller(channel).request(target, mode, immediate=True)
+                await asyncio.shield(req.started)
+            result["started_s"] = round(time.monotonic() - t0, 3)
+            result["reached"] = await asyncio.shield(req.done)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise  # the service call itself is going away
+            result["reached"] = False
+            result["error"] = "cancelled"
+        except Exception as e:  # noqa: BLE001 - reported for this window, the others carry on
+            result["reached"] = False
+            result["error"] = str(e) or type(e).__name__
+        result["completed_s"] = round(time.monotonic() - t0, 3)
+        motor = coordinator.data.motors.get(channel) if coordinator.data else None
+        result["position"] = motor.current_pos if motor else None
+        return result
+
+    results = await asyncio.gather(*(_move(*m) for m in ordered))
+    report: dict[str, Any] = {
+        "mode": mode,
+        "duration_s": round(time.monotonic() - t0, 3),
+        "windows": list(results),
+    }
+    hass.bus.async_fire(EVENT_BATCH_COMPLETED, report)
+    return report if call.return_response else None
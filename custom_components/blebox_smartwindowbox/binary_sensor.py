@@ -3,51 +3,44 @@ from __future__ import annotations
 from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.const import EntityCategory
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import BleBoxCoordinator
-
-
-def _sensor_list(data: dict[str, Any]) -> list[dict[str, Any]]:
-    return (data.get("window") or {}).get("sensors") or []
+from .entity import BleBoxEntity
+from .models import MotorState, SensorState
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator: BleBoxCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    sensors = _sensor_list(coordinator.data)
-
     entities: list[BinarySensorEntity] = []
 
     # Only add rain sensor (your device has type "rain")
-    for s in sensors:
-        if str(s.get("type")) == "rain":
-            entities.append(BleBoxRainBinarySensor(coordinator, entry.entry_id, int(s.get("id", 0))))
+    for s in coordinator.data.sensors.values():
+        if s.type == "rain":
+            entities.append(BleBoxRainBinarySensor(coordinator, entry, s.id))
+    for channel in coordinator.data.motors:
+        entities.append(BleBoxCalibratedBinarySensor(coordinator, entry, channel))
 
     async_add_entities(entities)
 
 
-class BleBoxRainBinarySensor(CoordinatorEntity[BleBoxCoordinator], BinarySensorEntity):
-    _attr_has_entity_name = True
+class BleBoxRainBinarySensor(BleBoxEntity, BinarySensorEntity):
     _attr_device_class = "moisture"  # best fit for rain detection
 
-    def __init__(self, coordinator: BleBoxCoordinator, entry_id: str, sensor_id: int) -> None:
-        super().__init__(coordinator)
-        self._entry_id = entry_id
+    def __init__(self, coordinator: BleBoxCoordinator, entry: ConfigEntry, sensor_id: int) -> None:
+        super().__init__(coordinator, entry, context=("sensor", ("rain", sensor_id)))
         self._sensor_id = sensor_id
-        self._attr_unique_id = f"{entry_id}_rain_{sensor_id}"
+        self._attr_unique_id = f"{entry.entry_id}_rain_{sensor_id}"
         self._attr_name = "Rain"
 
-    def _sensor(self) -> dict[str, Any] | None:
-        for s in (self.coordinator.data.get("window") or {}).get("sensors") or []:
-            if str(s.get("type")) == "rain" and int(s.get("id", -1)) == self._sensor_id:
-                return s
-        return None
+    def _sensor(self) -> SensorState | None:
+        return self.coordinator.data.sensors.get(("rain", self._sensor_id))
 
     @property
     def is_on(self) -> bool | None:
@@ -55,14 +48,40 @@ class BleBoxRainBinarySensor(CoordinatorEntity[BleBoxCoordinator], BinarySensorE
         if not s:
             return None
         # Your payload: rain.value == 1 when raining
-        return s.get("value") == 1
+        return s.value == 1
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        s = self._sensor() or {}
+        s = self._sensor()
         return {
-            "state": s.get("state"),
-            "trend": s.get("trend"),
-            "elapsedTimeS": s.get("elapsedTimeS"),
-            "iconSet": s.get("iconSet"),
-        }
\ No newline at end of file
+            "state": s.state if s else None,
+            "trend": s.trend if s else None,
+            "elapsedTimeS": s.elapsed_time_s if s else None,
+            "iconSet": s.icon_set if s else None,
+        }
+
+
+class BleBoxCalibratedBinarySensor(BleBoxEntity, BinarySensorEntity):
+    """Whether the motor's travel has been calibrated on the device."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: BleBoxCoordinator, entry: ConfigEntry, channel: int) -> None:
+        super().__init__(coordinator, entry, context=("calibration", channel))
+        self._channel = channel
+        self._attr_unique_id = f"{entry.entry_id}_motor_{channel}_calibrated"
+
+    def _motor(self) -> MotorState | None:
+        return self.coordinator.data.motors.get(self._channel)
+
+    @property
+    def name(self) -> str | None:
+        motor = self._motor()
+        return f"{(motor and motor.name) or f'Motor {self._channel}'} Calibrated"
+
+    @property
+    def is_on(self) -> bool | None:
+        motor = self._motor()
+        if motor is None or motor.is_calibrated is None:
+            return None
+        return bool(motor.is_calibrated)
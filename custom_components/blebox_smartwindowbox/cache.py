@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import DeviceInfo
+from .const import DOMAIN, STATE_CACHE_SAVE_DELAY_SEC
+from .models import WindowState
+
+STORAGE_VERSION = 1
+
+
+class StateCache:
+    """
+    Last good state payload and device info of one config entry.
+    Lets setup create entities and report state before the device has answered.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str | None) -> None:
+        self._store: Store | None = (
+            Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.state") if entry_id else None
+        )
+        self._payload: dict[str, Any] | None = None
+        self._device: DeviceInfo | None = None
+        self._saved: WindowState | None = None
+
+    async def async_load(self) -> tuple[dict[str, Any], DeviceInfo | None] | None:
+        if self._store is None:
+            return None
+        data = await self._store.async_load()
+        if not data or not isinstance(data.get("payload"), dict):
+            return None
+        self._payload = data["payload"]
+        try:
+            self._device = DeviceInfo(**data["device"]) if data.get("device") else None
+        except TypeError:
+            self._device = None
+        return self._payload, self._device
+
+    async def async_remove(self) -> None:
+        if self._store is not None:
+            await self._store.async_remove()
+
+    def update_state(self, data: WindowState) -> None:
+        """Remember a live state; written only when motors or sensors changed, and never mid-move."""
+        if any(m.moving for m in data.motors.values()):
+            return
+        saved = self._saved
+        if saved is not None and saved.motors == data.motors and saved.sensors == data.sensors:
+            return
+        self._saved = data
+        self._payload = data.raw
+        self._schedule_save()
+
+    def update_device(self, device: DeviceInfo) -> None:
+        if device != self._device:
+            self._device = device
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        if self._store is not None and self._payload is not None:
+            self._store.async_delay_save(self._data_to_save, STATE_CACHE_SAVE_DELAY_SEC)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "payload": self._payload,
+            "device": asdict(self._device) if self._device else None,
+        }
@@ -1,13 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import ipaddress
+import logging
+
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import BleBoxSmartWindowBoxApi, BleBoxApiError
-from .const import DOMAIN, CONF_HOST, CONF_NAME, DEFAULT_NAME
+from .api import BleBoxSmartWindowBoxApi, BleBoxApiError, DeviceInfo
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_NAME,
+    DEFAULT_NAME,
+    CONF_RAIN_INTERVAL,
+    CONF_RAIN_CLOSE_CHANNELS,
+    DEFAULT_RAIN_INTERVAL_SEC,
+    CONF_SUBNET,
+    CONF_DEVICES,
+)
+from .discovery import async_scan, parse_hosts
+
+_LOGGER = logging.getLogger(__name__)
 
 
 async def _validate(hass: HomeAssistant, host: str) -> dict:
@@ -24,7 +44,20 @@ async def _validate(hass: HomeAssistant, host: str) -> dict:
 class BleBoxSmartWindowBoxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> BleBoxOptionsFlow:
+        return BleBoxOptionsFlow(config_entry)
+
+    def __init__(self) -> None:
+        self._discovered: dict[str, tuple[str, DeviceInfo]] = {}
+        self._chosen: str | None = None  # device added by this flow itself
+        self._failed: dict[str, str] = {}  # host -> abort reason of its import flow
+
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(step_id="user", menu_options=["manual", "discover"])
+
+    async def async_step_manual(self, user_input=None):
         errors = {}
 
         if user_input is not None:
@@ -57,4 +90,133 @@ class BleBoxSmartWindowBoxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
-        return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
\ No newline at end of file
+        return self.async_show_form(step_id="manual", data_schema=schema, errors=errors)
+
+    async def async_step_discover(self, user_input=None):
+        errors = {}
+
+        if user_input is not None:
+            try:
+                hosts = parse_hosts(user_input[CONF_SUBNET])
+            except ValueError:
+                errors[CONF_SUBNET] = "invalid_subnet"
+            else:
+                found = await async_scan(async_get_clientsession(self.hass), hosts, self._async_current_ids())
+                _LOGGER.debug("Scanned %d addresses, %d new window boxes", len(hosts), len(found))
+                if found:
+                    self._discovered = {info.device_id: (host, info) for host, info in found}
+                    return await self.async_step_discover_select()
+                errors["base"] = "no_devices_found"
+
+        default = user_input[CONF_SUBNET] if user_input else await self._async_default_subnet()
+        schema = vol.Schema({vol.Required(CONF_SUBNET, default=default): str})
+
+        return self.async_show_form(step_id="discover", data_schema=schema, errors=errors)
+
+    async def async_step_discover_select(self, user_input=None):
+        errors = {}
+
+        if user_input is not None:
+            chosen = [device_id for device_id in user_input[CONF_DEVICES] if device_id in self._discovered]
+            if chosen:
+                self._chosen = chosen[0]
+                # A flow creates one entry: the others are added through import flows of their own
+                hosts = [self._discovered[device_id][0] for device_id in chosen[1:]]
+                results = await asyncio.gather(
+                    *(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data={CONF_HOST: host}
+                        )
+                        for host in hosts
+                    ),
+                    return_exceptions=True,
+                )
+                self._failed = {}
+                for host, result in zip(hosts, results):
+                    if isinstance(result, BaseException):
+                        _LOGGER.warning("Adding %s failed: %s", host, result)
+                        self._failed[host] = "unknown"
+                    elif result["type"] != FlowResultType.CREATE_ENTRY:
+                        self._failed[host] = result.get("reason") or "unknown"
+                if self._failed:
+                    return await self.async_step_discover_failed()
+                return await self._async_create_chosen()
+            errors["base"] = "no_devices_selected"
+
+        devices = {
+            device_id: f"{info.device_name or DEFAULT_NAME} ({host})"
+            for device_id, (host, info) in self._discovered.items()
+        }
+        schema = vol.Schema({vol.Required(CONF_DEVICES, default=list(devices)): cv.multi_select(devices)})
+
+        return self.async_show_form(
+            step_id="discover_select",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"count": str(len(devices))},
+        )
+
+    async def async_step_discover_failed(self, user_input=None):
+        """Some of the selected devices could not be added: say which before finishing."""
+        if user_input is not None:
+            return await self._async_create_chosen()
+        failed = "\n".join(f"- {host}: {reason.replace('_', ' ')}" for host, reason in self._failed.items())
+        return self.async_show_form(
+            step_id="discover_failed",
+            data_schema=vol.Schema({}),
+            description_placeholders={"failed": failed},
+        )
+
+    async def _async_create_chosen(self):
+        host, info = self._discovered[self._chosen]
+        await self.async_set_unique_id(info.device_id)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=info.device_name or DEFAULT_NAME, data={CONF_HOST: host})
+
+    async def async_step_import(self, import_data):
+        try:
+            result = await _validate(self.hass, import_data[CONF_HOST])
+        except BleBoxApiError:
+            return self.async_abort(reason="cannot_connect")
+
+        await self.async_set_unique_id(result["unique_id"])
+        self._abort_if_unique_id_configured()
+
+        return self.async_create_entry(title=result["title"], data={CONF_HOST: import_data[CONF_HOST]})
+
+    async def _async_default_subnet(self) -> str:
+        """The /24 Home Assistant itself is on."""
+        try:
+            source_ip = await network.async_get_source_ip(self.hass)
+        except Exception:  # no usable network configuration: let the user type it
+            return ""
+        return str(ipaddress.IPv4Network(f"{source_ip}/24", strict=False))
+
+
+class BleBoxOptionsFlow(config_entries.OptionsFlow):
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        # Channel choices come from the running device (names as set in the BleBox app)
+        channels: dict[str, str] = {}
+        runtime = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if runtime and runtime["coordinator"].data:
+            for ch, motor in runtime["coordinator"].data.motors.items():
+                channels[str(ch)] = motor.name or f"Motor {ch}"
+        options = self._entry.options
+        selected = [ch for ch in options.get(CONF_RAIN_CLOSE_CHANNELS, []) if ch in channels]
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_RAIN_INTERVAL,
+                    default=options.get(CONF_RAIN_INTERVAL, DEFAULT_RAIN_INTERVAL_SEC),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Optional(CONF_RAIN_CLOSE_CHANNELS, default=selected): cv.multi_select(channels),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from .const import KEEPALIVE_TIMEOUT_SEC, MAX_CONNECTIONS_PER_DEVICE
+from .metrics import TransportMetrics
+
+
+class DeviceConnection:
+    """
+    Dedicated keep-alive HTTP session for one device.
+    The shared Home Assistant session tunes its pool for many hosts; these small
+    embedded servers do better with one long-lived socket that is reused for
+    every poll. New vs. reused connections are counted into the device metrics,
+    and how long a connect takes feeds the adaptive connect timeout.
+    """
+
+    def __init__(self, metrics: TransportMetrics) -> None:
+        self._metrics = metrics
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_start.append(self._on_connection_create_start)
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        connector = aiohttp.TCPConnector(
+            limit_per_host=MAX_CONNECTIONS_PER_DEVICE,
+            keepalive_timeout=KEEPALIVE_TIMEOUT_SEC,
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+
+    async def _on_connection_create_start(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        ctx.connect_started = time.monotonic()
+
+    async def _on_connection_created(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        self._metrics.connections_created += 1
+        if hasattr(ctx, "connect_started"):
+            self._metrics.connect_rtt.record(time.monotonic() - ctx.connect_started)
+
+    async def _on_connection_reused(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        self._metrics.connections_reused += 1
+
+    async def async_close(self) -> None:
+        if not self.session.closed:
+            await self.session.close()
@@ -4,10 +4,47 @@ CONF_HOST = "host"
 CONF_NAME = "name"
 DEFAULT_NAME = "BleBox smartWindowBox"
 
-PLATFORMS = ["cover", "binary_sensor"]
+# Options
+CONF_RAIN_INTERVAL = "rain_interval"
+CONF_RAIN_CLOSE_CHANNELS = "rain_close_channels"
+DEFAULT_RAIN_INTERVAL_SEC = 0   # rain lane cadence, opt-in; 0 = rain follows the regular refresh
+
+EVENT_RAIN_DETECTED = f"{DOMAIN}_rain_detected"
+
+PLATFORMS = ["cover", "binary_sensor", "sensor"]
 
 UPDATE_INTERVAL_SECONDS = 5
 
+# Adaptive coordinator polling
+MOVING_UPDATE_INTERVAL_SECONDS = 1      # while any motor is moving / has a pending target
+IDLE_UPDATE_INTERVAL_SECONDS = 30       # ceiling once every motor is idle
+IDLE_BACKOFF_FACTOR = 2                 # step from UPDATE_INTERVAL_SECONDS up to the idle ceiling
+ERROR_UPDATE_INTERVAL_SECONDS = 120     # ceiling while refreshes keep failing
+PENDING_TARGET_MAX_POLLS = 3            # desiredPos != currentPos without progress stops counting as motion
+STATE_MAX_AGE_SEC = 0.3                 # coordinator reuses a state fetched this recently
+
+# Domain-wide poll scheduling (all config entries)
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"  # hass.data key of the shared PollScheduler
+MAX_CONCURRENT_POLLS = 4                # state refreshes in flight at once, across all boxes
+POLL_JITTER_FRACTION = 0.25             # +/- share of a device's slot width
+
+# Device health (circuit breaker)
+HEALTH_OFFLINE_AFTER_FAILURES = 3       # failed requests in a row before a device counts as offline ...
+HEALTH_OFFLINE_MIN_SEC = 10             # ... spanning at least this long (adaptive timeouts fail within a second)
+PROBE_INTERVAL_MIN_SEC = 5              # first probe of an offline device after this ...
+PROBE_INTERVAL_MAX_SEC = 120            # ... doubling up to this
+PROBE_TIMEOUT_SEC = 3.0                 # timeout ceiling while degraded/offline (instead of 8 s)
+
+# Adaptive timeouts: srtt + 4 * rttvar of each endpoint, between these floors and the configured timeout
+READ_TIMEOUT_MIN_SEC = 0.5              # a TCP retransmit of the request still fits
+CONNECT_TIMEOUT_MIN_SEC = 1.5           # one lost SYN (retransmitted after 1 s) still fits
+HEDGE_DELAY_MIN_SEC = 0.15              # a state read still unanswered after max(this, srtt + 2 * rttvar) is sent again
+HEDGE_MIN_SAMPLES = 8                   # round trips measured on an endpoint before its reads are hedged
+
+# Per-device HTTP connection
+KEEPALIVE_TIMEOUT_SEC = 60              # keep the idle socket open across slow idle polls
+MAX_CONNECTIONS_PER_DEVICE = 2          # one in use + one spare for a hedged read or a preempted one being torn down
+
 # Motor commands
 CMD_UP = "u"       # moves toward position 0 (open) on your device
 CMD_DOWN = "d"     # moves toward position 100 (close) on your device
@@ -18,4 +55,49 @@ CMD_FAV = "f"
 # Emulated position control tuning
 POSITION_TOLERANCE = 1          # stop when within 1%
 POLL_INTERVAL_SEC = 0.35        # fast polling while moving to target
-EXTRA_STOP_DELAY_SEC = 0.15     # optional second stop to reduce coasting
\ No newline at end of file
+MOVE_MAX_FAILED_POLLS = 3       # polls in a row without an answer before a move is stopped and fails
+                                # (sooner if the next failure would take the device offline)
+EXTRA_STOP_DELAY_SEC = 0.15     # optional second stop to reduce coasting
+
+# Predictive stop
+SPEED_SAMPLE_WINDOW = 6         # recent poll samples used for the speed estimate
+STOP_LATENCY_DEFAULT_SEC = 0.15 # assumed STOP delivery latency until measured
+LATENCY_LEARN_RATE = 0.3        # EWMA weight for measured command latency
+COAST_LEARN_RATE = 0.3          # EWMA weight for learned coasting distance
+COAST_MAX_PCT = 5.0             # never assume more coasting than this
+COAST_SETTLE_TICKS = 3          # ticks to wait after STOP for the resting position
+TARGET_DEBOUNCE_SEC = 0.25      # a new target must be quiet this long before it is acted on
+
+# Set-position modes
+MODE_CLOSED_LOOP = "closed_loop"  # poll while moving, stop on the observed position
+MODE_TIMED = "timed"              # run for the predicted time, verify once afterwards
+TIMED_MAX_CORRECTIONS = 1         # corrective timed moves after the verification read
+TIMED_SETTLE_SEC = 0.5            # wait for coasting before the verification read
+TIMED_ENDPOINT_MARGIN = 1.1       # endpoint moves: predicted run time x this, then verify
+
+# Batch moves (move_windows service)
+BATCH_MAX_PARALLEL_STARTS = 8     # start commands in flight at once, across all devices
+EVENT_BATCH_COMPLETED = f"{DOMAIN}_batch_completed"
+
+# Move traces (debug service)
+TRACE_HISTORY = 5                 # finished traces kept per channel for diagnostics
+TRACE_DIR = f"{DOMAIN}_traces"    # under the Home Assistant config directory
+TRACE_SETTLE_SEC = 1.0            # wait for coasting before the final position read
+
+# Learned travel-time model
+TRAVEL_PROFILE_BANDS = 10       # position bands per direction (10% each)
+TRAVEL_LEARN_RATE = 0.2         # EWMA weight of one observed segment
+TRAVEL_MAX_SEGMENT_SEC = 5.0    # samples further apart than this are not compared
+TRAVEL_SAVE_DELAY_SEC = 60      # batch profile writes to storage
+STATE_CACHE_SAVE_DELAY_SEC = 30 # batch writes of the cached device state
+USAGE_SAVE_DELAY_SEC = 60       # batch writes of the motor usage totals
+USAGE_MAX_GAP_SEC = 5.0         # run time counted between two samples of a moving motor, at most
+USAGE_REVERSAL_WINDOW_SEC = 5.0 # a run in the other direction this soon after a stop is a reversal
+INTERPOLATE_INTERVAL_SEC = 0.5  # entity position updates between polls while moving
+# Subnet discovery (config flow)
+CONF_SUBNET = "subnet"
+CONF_DEVICES = "devices"
+DISCOVERY_MAX_PARALLEL = 64         # addresses probed at the same time
+DISCOVERY_MAX_HOSTS = 1024          # largest range one scan may cover (a /22)
+DISCOVERY_CONNECT_TIMEOUT_SEC = 0.5 # LAN hosts answer a connect in milliseconds; nobody there -> move on
+DISCOVERY_TIMEOUT_SEC = 2.0         # read budget for /api/device/state per address
\ No newline at end of file
@@ -1,17 +1,40 @@
 from __future__ import annotations
 
+import time
 from datetime import timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import BleBoxSmartWindowBoxApi, BleBoxApiError
-from .const import DOMAIN, UPDATE_INTERVAL_SECONDS
+from .api import BleBoxSmartWindowBoxApi, BleBoxApiError, DeviceInfo
+from .cache import StateCache
+from .const import (
+    DOMAIN,
+    UPDATE_INTERVAL_SECONDS,
+    MOVING_UPDATE_INTERVAL_SECONDS,
+    IDLE_UPDATE_INTERVAL_SECONDS,
+    IDLE_BACKOFF_FACTOR,
+    ERROR_UPDATE_INTERVAL_SECONDS,
+    PENDING_TARGET_MAX_POLLS,
+    STATE_MAX_AGE_SEC,
+)
+from .models import MotorState, WindowState, parse_window_state
+from .motion import MotionTracker
+from .positioning import ChannelController
+from .scheduler import PollScheduler
+from .travel_model import TravelModel
+from .usage import UsageStats
 
 
-class BleBoxCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    def __init__(self, hass: HomeAssistant, api: BleBoxSmartWindowBoxApi) -> None:
+class BleBoxCoordinator(DataUpdateCoordinator[WindowState]):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: BleBoxSmartWindowBoxApi,
+        scheduler: PollScheduler | None = None,
+        entry_id: str | None = None,
+    ) -> None:
         super().__init__(
             hass,
             logger=__import__("logging").getLogger(__name__),
@@ -19,9 +42,241 @@ class BleBoxCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             update_interval=timedelta(seconds=UPDATE_INTERVAL_SECONDS),
         )
         self.api = api
+        self.motion = MotionTracker(api)
+        self.controllers: dict[int, ChannelController] = {}
+        # Channels on an open-loop (timed) move: their motion does not speed up polling
+        self.quiet_channels: set[int] = set()
+        # Learned per-motor travel speeds, fed by refreshes and motion ticks
+        self.travel = TravelModel(hass, entry_id)
+        # Running motor wear totals, fed by the same samples
+        self.usage = UsageStats(hass, entry_id)
+        self.motion.on_sample = self._observe
 
-    async def _async_update_data(self) -> dict[str, Any]:
+        # Last good state/device info, for entity setup before the device answers
+        self.cache = StateCache(hass, entry_id)
+        self.device: DeviceInfo | None = None
+        self.from_cache = False
+
+        # Domain-wide staggering / concurrency cap (optional)
+        self._scheduler = scheduler
+        self._scheduler_key = entry_id or api.base_url
+
+        # Adaptive polling state
+        self._base_interval: float = UPDATE_INTERVAL_SECONDS
+        self._consecutive_failures = 0
+        self._pending_polls: dict[int, int] = {}  # channel -> polls with desired != current and no progress
+        self._last_positions: dict[int, int | None] = {}
+
+        # Change detection: what listeners were last notified with
+        self._notified: WindowState | None = None
+        self._notified_success: bool | None = None
+
+    async def _async_update_data(self) -> WindowState:
         try:
-            return await self.api.window_extended_state()
+            if self._scheduler is not None:
+                async with self._scheduler.slot():
+                    started = time.monotonic()
+                    payload = await self._fetch_state()
+            else:
+                started = time.monotonic()
+                payload = await self._fetch_state()
         except BleBoxApiError as e:
-            raise UpdateFailed(str(e)) from e
\ No newline at end of file
+            self._consecutive_failures += 1
+            backoff = min(
+                ERROR_UPDATE_INTERVAL_SECONDS,
+                UPDATE_INTERVAL_SECONDS * 2 ** (self._consecutive_failures - 1),
+            )
+            # Offline: polling before the next probe is due would only fail fast again
+            self._set_interval(max(backoff, self.api.health.probe_in))
+            raise UpdateFailed(str(e)) from e
+
+        # Parse once here; entities read the typed records by channel / sensor id
+        data = parse_window_state(payload)
+        finished = time.monotonic()
+        self.api.metrics.record_refresh(finished - started)
+        self._observe(data.motors, (started + finished) / 2)
+
+        self._consecutive_failures = 0
+        self._adapt_interval(data)
+        self.from_cache = False
+        self.cache.update_state(data)
+        return data
+
+    def _observe(self, motors: dict[int, MotorState], t: float) -> None:
+        """Every state sample (refresh, motion tick, command response) feeds the learned models."""
+        self.travel.observe(motors, t)
+        self.usage.observe(motors, t)
+
+    async def async_restore(self) -> bool:
+        """Seed data and device info from the previous run. True if a cached state was found."""
+        cached = await self.cache.async_load()
+        if cached is None:
+            return False
+        payload, self.device = cached
+        self.data = parse_window_state(payload)
+        self.from_cache = True
+        return True
+
+    async def async_update_device_info(self) -> DeviceInfo:
+        self.device = await self.api.device_state()
+        self.cache.update_device(self.device)
+        return self.device
+
+    def controller(self, channel: int) -> ChannelController:
+        """The set-position controller of a channel (created on first use)."""
+        if channel not in self.controllers:
+            self.controllers[channel] = ChannelController(self, channel)
+        return self.controllers[channel]
+
+    async def async_shutdown(self) -> None:
+        for controller in self.controllers.values():
+            controller.shutdown()
+        self.motion.async_stop()
+        await super().async_shutdown()
+
+    async def _fetch_state(self) -> dict[str, Any]:
+        # A state fetched moments ago (e.g. by a set-position poll) is good enough here
+        return await self.api.window_extended_state(max_age=STATE_MAX_AGE_SEC)
+
+    async def async_apply_command_response(self, channel: int, response: Any) -> None:
+        """
+        Merge the motor state a command endpoint returned into data.
+        Falls back to a regular refresh if the response does not carry that motor's state.
+        """
+        window = response.get("window") if isinstance(response, dict) else None
+        motors = (window or {}).get("motors") if isinstance(window, dict) else None
+        updates = {
+            int(m.get("id", -1)): m
+            for m in motors or []
+            if isinstance(m, dict) and "state" in m and "currentPos" in m
+        }
+        if channel not in updates or self.data is None:
+            await self.async_request_refresh()
+            return
+
+        raw = self.data.raw
+        merged_window = dict(raw.get("window") or {})
+        merged_window["motors"] = [
+            {**m, **updates[int(m.get("id", -1))]} if int(m.get("id", -1)) in updates else m
+            for m in merged_window.get("motors") or []
+        ]
+        data = parse_window_state({**raw, "window": merged_window})
+        self._observe(data.motors, time.monotonic())
+        # A command just went out, so look again soon whatever the response said
+        # (unless a timed move verifies that channel itself).
+        # Interval first: async_set_updated_data reschedules the next refresh with it.
+        if self._motion_pending(data) or channel not in self.quiet_channels:
+            self._set_interval(MOVING_UPDATE_INTERVAL_SECONDS)
+        self.async_set_updated_data(data)
+
+    @callback
+    def async_apply_sensor_states(self, sensors: list[dict[str, Any]]) -> None:
+        """
+        Merge a sensors slice fetched outside the regular refresh (rain lane).
+        Listeners hear about it only if a sensor changed; the refresh schedule is left alone.
+        """
+        if self.data is None:
+            return
+        raw = self.data.raw
+        data = parse_window_state({**raw, "window": {**(raw.get("window") or {}), "sensors": sensors}})
+        if data.sensors == self.data.sensors:
+            return
+        self.data = data
+        self.async_update_listeners()
+
+    def _adapt_interval(self, data: WindowState) -> None:
+        if self._motion_pending(data):
+            self._set_interval(MOVING_UPDATE_INTERVAL_SECONDS)
+        else:
+            # Step down gradually: base interval first, then grow toward the idle ceiling
+            self._set_interval(
+                min(
+                    IDLE_UPDATE_INTERVAL_SECONDS,
+                    max(UPDATE_INTERVAL_SECONDS, self._base_interval * IDLE_BACKOFF_FACTOR),
+                )
+            )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """
+        Notify only listeners whose record changed since the last notification.
+        Entities register with a ("motor", channel), ("calibration", channel) or
+        ("sensor", (type, id)) context; other listeners, and availability changes, always
+        get notified.
+        """
+        previous = self._notified
+        notify_all = previous is None or self.data is None or self.last_update_success != self._notified_success
+        for update_callback, context in list(self._listeners.values()):
+            if notify_all or _record(previous, context) != _record(self.data, context):
+                update_callback()
+        self._notified = self.data
+        self._notified_success = self.last_update_success
+
+    def _set_interval(self, seconds: float) -> None:
+        self._base_interval = seconds
+        # DataUpdateCoordinator reads update_interval when scheduling the next refresh
+        self.update_interval = timedelta(seconds=seconds)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """
+        With a scheduler, the next refresh goes out on this device's phase, so boxes
+        don't poll in sync. Scheduled here at the exact time: DataUpdateCoordinator
+        rounds to the second and adds a random offset, more than a phase slot is wide.
+        """
+        if self._scheduler is None or self.update_interval is None:
+            super()._schedule_refresh()
+            return
+        if self.config_entry and self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        delay = self._scheduler.align(self._scheduler_key, self.update_interval.total_seconds())
+        self._unsub_refresh = self.hass.loop.call_later(delay, self.hass.async_run_hass_job, self._job).cancel
+
+    def _motion_pending(self, data: WindowState) -> bool:
+        """True while any motor moves or has a target it has not reached yet."""
+        pending = False
+        for channel, m in data.motors.items():
+            if channel in self.quiet_channels:
+                continue
+            cur = m.current_pos
+            progressed = self._last_positions.get(channel) != cur
+            self._last_positions[channel] = cur
+
+            if m.moving:
+                self._pending_polls.pop(channel, None)
+                pending = True
+            elif cur is not None and m.desired_pos is not None and cur != m.desired_pos:
+                # A target the motor has not started on yet (or a stale one the device keeps
+                # reporting after a stop): only trust it while it keeps changing.
+                polls = 0 if progressed else self._pending_polls.get(channel, 0) + 1
+                self._pending_polls[channel] = polls
+                if polls < PENDING_TARGET_MAX_POLLS:
+                    pending = True
+            else:
+                self._pending_polls.pop(channel, None)
+        return pending
+
+
+def _record(data: WindowState | None, context: Any) -> Any:
+    """The slice of data a listener context depends on (a fresh sentinel if unknown)."""
+    if data is not None and isinstance(context, tuple) and len(context) == 2:
+        kind, key = context
+        if kind == "motor":
+            return data.motors.get(key)
+        if kind == "sensor":
+            return data.sensors.get(key)
+        if kind == "calibration":
+            m = data.motors.get(key)
+            if m is None:
+                return None
+            return (
+                m.name,
+                m.fav_pos,
+                m.control_type,
+                m.icon_set,
+                m.is_calibrated,
+                m.max_move_time_up_ms,
+                m.max_move_time_down_ms,
+            )
+    return object()
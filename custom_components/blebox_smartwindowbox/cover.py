@@ -1,49 +1,60 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import logging
+import os
 import time
+from datetime import datetime
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.components.cover import CoverEntity, CoverEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_call_later
 
 from .const import (
     DOMAIN,
-    CONF_NAME,
     CMD_UP,
     CMD_DOWN,
     CMD_STOP,
     CMD_FAV,
     CMD_NEXT,
-    POSITION_TOLERANCE,
-    POLL_INTERVAL_SEC,
-    EXTRA_STOP_DELAY_SEC,
+    INTERPOLATE_INTERVAL_SEC,
+    MODE_CLOSED_LOOP,
+    MODE_TIMED,
+    TRAVEL_MAX_SEGMENT_SEC,
+    TRACE_DIR,
+    TRACE_SETTLE_SEC,
 )
+from .api import BleBoxApiError, DeviceOfflineError
 from .coordinator import BleBoxCoordinator
+from .entity import BleBoxEntity
+from .models import MotorState, parse_window_state
+from .trace import MoveTrace
+from .travel_model import VelocityProfile
 
+_LOGGER = logging.getLogger(__name__)
 
-def _motor_list(data: dict[str, Any]) -> list[dict[str, Any]]:
-    return (data.get("window") or {}).get("motors") or []
+_SET_POSITION_SCHEMA = {
+    vol.Required("position"): vol.Coerce(int),
+    vol.Optional("mode", default=MODE_CLOSED_LOOP): vol.In([MODE_CLOSED_LOOP, MODE_TIMED]),
+}
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator: BleBoxCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    motors = _motor_list(coordinator.data)
-
-    name_prefix = entry.data.get(CONF_NAME) or None
 
     entities: list[BleBoxMotorCover] = []
-    for motor in motors:
-        channel = int(motor.get("id", 0))
-        entities.append(BleBoxMotorCover(coordinator, entry.entry_id, channel, name_prefix))
+    for channel in coordinator.data.motors:
+        entities.append(BleBoxMotorCover(coordinator, entry, channel))
 
     async_add_entities(entities)
 
@@ -51,23 +62,29 @@ async def async_setup_entry(
     platform = entity_platform.async_get_current_platform()
     platform.async_register_entity_service("favorite", {}, "async_favorite")
     platform.async_register_entity_service("next_step", {}, "async_next_step")
-    platform.async_register_entity_service(
-        "set_position",
-        {vol.Required("position"): vol.Coerce(int)},
-        "async_set_cover_position",
-    )
+    platform.async_register_entity_service("set_position", _SET_POSITION_SCHEMA, "async_set_cover_position")
+    platform.async_register_entity_service("trace_set_position", _SET_POSITION_SCHEMA, "async_trace_set_position")
 
 
-class BleBoxMotorCover(CoordinatorEntity[BleBoxCoordinator], CoverEntity):
-    _attr_has_entity_name = True
+def _write_trace(directory: str, filename: str, data: dict[str, Any]) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return path
 
-    def __init__(self, coordinator: BleBoxCoordinator, entry_id: str, channel: int, name_prefix: str | None) -> None:
-        super().__init__(coordinator)
-        self._entry_id = entry_id
+
+class BleBoxMotorCover(BleBoxEntity, CoverEntity):
+    # Derived every tick from the others; not worth a recorder row each
+    _unrecorded_attributes = frozenset(
+        {"move_elapsed_s", "estimated_total_s", "estimated_remaining_s", "move_progress_pct", "estimated_position"}
+    )
+
+    def __init__(self, coordinator: BleBoxCoordinator, entry: ConfigEntry, channel: int) -> None:
+        super().__init__(coordinator, entry, context=("motor", channel))
         self._channel = channel
-        self._name_prefix = name_prefix
 
-        self._attr_unique_id = f"{entry_id}_motor_{channel}"
+        self._attr_unique_id = f"{entry.entry_id}_motor_{channel}"
         self._attr_supported_features = (
             CoverEntityFeature.OPEN
             | CoverEntityFeature.CLOSE
@@ -81,50 +98,60 @@ class BleBoxMotorCover(CoordinatorEntity[BleBoxCoordinator], CoverEntity):
         self._move_start_pos: int | None = None
         self._move_target: int | None = None
         self._move_direction: str | None = None  # "opening" / "closing"
-        self._move_full_time_s: float | None = None
+        self._move_profile: VelocityProfile | None = None  # learned speeds for this direction
+
+        # Last polled position while moving; the shown position is interpolated from it
+        self._sample_at: float | None = None
+        self._sample_pos: int | None = None
+        self._unsub_interpolate: CALLBACK_TYPE | None = None
+        self._shown_pos: int | None = None
 
-    def _motor(self) -> dict[str, Any] | None:
-        for m in _motor_list(self.coordinator.data):
-            if int(m.get("id", -1)) == self._channel:
-                return m
-        return None
+    def _motor(self) -> MotorState | None:
+        return self.coordinator.data.motors.get(self._channel)
 
     @property
     def name(self) -> str | None:
-        motor = self._motor() or {}
-        base = motor.get("name") or f"Motor {self._channel}"
-        if self._name_prefix:
-            return f"{self._name_prefix} {base}"
-        return str(base)
+        # Home Assistant puts the device name (the configured name) in front
+        motor = self._motor()
+        return str((motor and motor.name) or f"Motor {self._channel}")
 
     # Your device scale:
     # 0 = fully open, 100 = fully closed
     @property
     def current_cover_position(self) -> int | None:
         motor = self._motor()
-        if not motor:
+        if motor is None:
             return None
-        pos = (motor.get("currentPos") or {}).get("position")
-        try:
-            return int(pos)
-        except (TypeError, ValueError):
+        pos = self._interpolated_position()
+        return round(pos) if pos is not None else motor.current_pos
+
+    def _interpolated_position(self) -> float | None:
+        """Position between two polls, from the last polled one and the learned speed profile."""
+        if (
+            not self._tracked_moving
+            or self._move_profile is None
+            or self._sample_at is None
+            or self._sample_pos is None
+        ):
             return None
-
-    # Your observed mapping:
-    # 0 closing (moving to 100)
-    # 1 opening (moving to 0)
-    # 2 idle at intermediate position (e.g. favorite)
-    # 3 idle at closed (100)
-    # 4 idle at open (0)
+        # Never run ahead of the device for long if polls stop arriving
+        elapsed = min(time.monotonic() - self._sample_at, TRAVEL_MAX_SEGMENT_SEC)
+        sign = -1 if self._move_direction == "opening" else 1
+        pos = self._move_profile.position_after(self._sample_pos, elapsed, sign)
+        if self._move_target is not None and (pos - self._move_target) * sign > 0:
+            pos = float(self._move_target)
+        return pos
+
+    # State mapping: see MotorState
     @property
     def is_opening(self) -> bool:
-        motor = self._motor() or {}
-        return motor.get("state") == 1
+        motor = self._motor()
+        return motor is not None and motor.state == 1
 
     @property
     def is_closing(self) -> bool:
-        motor = self._motor() or {}
-        return motor.get("state") == 0
+        motor = self._motor()
+        return motor is not None and motor.state == 0
 
     @property
     def is_closed(self) -> bool | None:
@@ -133,51 +160,26 @@ class BleBoxMotorCover(CoordinatorEntity[BleBoxCoordinator], CoverEntity):
             return None
         return pos >= 100
 
-    def _full_travel_time_s(self, motor: dict[str, Any], direction: str) -> float:
-        calib = motor.get("calibrationParameters") or {}
-        up_ms = calib.get("maxMoveTimeUpMs") or 40000
-        down_ms = calib.get("maxMoveTimeDownMs") or 40000
-        ms = up_ms if direction == "opening" else down_ms
-        try:
-            return max(1.0, float(ms) / 1000.0)
-        except (TypeError, ValueError):
-            return 40.0
-
+    @callback
     def _handle_coordinator_update(self) -> None:
-        motor = self._motor() or {}
-
-        state = motor.get("state")
-        cur = (motor.get("currentPos") or {}).get("position")
-        des = (motor.get("desiredPos") or {}).get("position")
-
-        try:
-            cur_i = int(cur) if cur is not None else None
-        except (TypeError, ValueError):
-            cur_i = None
-        try:
-            des_i = int(des) if des is not None else None
-        except (TypeError, ValueError):
-            des_i = None
-
-        moving_now = state in (0, 1)
+        motor = self._motor()
 
-        if moving_now:
-            direction = "opening" if state == 1 else "closing"
-            target = des_i
+        if motor is not None and motor.moving:
+            direction = "opening" if motor.state == 1 else "closing"
+            target = motor.desired_pos
 
             if not self._tracked_moving:
                 self._tracked_moving = True
                 self._move_started = time.monotonic()
-                self._move_start_pos = cur_i
-                self._move_direction = direction
-                self._move_target = target
-                self._move_full_time_s = self._full_travel_time_s(motor, direction)
-            else:
-                # update target/direction if changed mid-move
-                self._move_direction = direction
-                self._move_target = target
-                if self._move_full_time_s is None:
-                    self._move_full_time_s = self._full_travel_time_s(motor, direction)
+                self._move_start_pos = motor.current_pos
+            # update target/direction if changed mid-move
+            self._move_direction = direction
+            self._move_target = target
+            self._move_profile = self.coordinator.travel.profile(motor, direction)
+            if motor.current_pos != self._sample_pos:
+                self._sample_at = time.monotonic()
+                self._sample_pos = motor.current_pos
+            self._schedule_interpolation()
 
         else:
             if self._tracked_moving:
@@ -186,69 +188,83 @@ class BleBoxMotorCover(CoordinatorEntity[BleBoxCoordinator], CoverEntity):
                 self._move_start_pos = None
                 self._move_target = None
                 self._move_direction = None
-                self._move_full_time_s = None
+                self._move_profile = None
+                self._sample_at = None
+                self._sample_pos = None
+            self._cancel_interpolation()
 
+        self._shown_pos = self.current_cover_position
         super()._handle_coordinator_update()
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        motor = self._motor() or {}
-        calib = motor.get("calibrationParameters") or {}
-        fav = motor.get("favPos") or {}
+    def _schedule_interpolation(self) -> None:
+        if self._unsub_interpolate is None:
+            self._unsub_interpolate = async_call_later(self.hass, INTERPOLATE_INTERVAL_SEC, self._interpolate)
 
-        cur = (motor.get("currentPos") or {}).get("position")
-        des = (motor.get("desiredPos") or {}).get("position")
+    def _cancel_interpolation(self) -> None:
+        if self._unsub_interpolate is not None:
+            self._unsub_interpolate()
+            self._unsub_interpolate = None
 
-        try:
-            cur_i = int(cur) if cur is not None else None
-        except (TypeError, ValueError):
-            cur_i = None
-        try:
-            des_i = int(des) if des is not None else None
-        except (TypeError, ValueError):
-            des_i = None
+    @callback
+    def _interpolate(self, _now: datetime) -> None:
+        """Write the estimated position between polls so the UI moves smoothly."""
+        self._unsub_interpolate = None
+        if not self._tracked_moving:
+            return
+        pos = self.current_cover_position
+        if pos != self._shown_pos:
+            self._shown_pos = pos
+            self.async_write_ha_state()
+        self._schedule_interpolation()
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._cancel_interpolation()
+        await super().async_will_remove_from_hass()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        motor = self._motor()
+        if motor is None:
+            return {}
+        cur_i = motor.current_pos
 
         estimated_total_s = None
         estimated_remaining_s = None
         move_elapsed_s = None
         move_progress_pct = None
 
-        if self._tracked_moving and self._move_started is not None and self._move_full_time_s is not None:
+        if self._tracked_moving and self._move_started is not None and self._move_profile is not None:
             move_elapsed_s = round(time.monotonic() - self._move_started, 2)
-
-            if cur_i is not None and self._move_target is not None:
-                distance_pct = abs(cur_i - self._move_target) / 100.0
-                estimated_total_s = round(self._move_full_time_s, 2)
-                estimated_remaining_s = round(distance_pct * self._move_full_time_s, 2)
-
-            if cur_i is not None and self._move_target is not None and self._move_start_pos is not None:
-                total_dist = abs(self._move_start_pos - self._move_target)
-                remaining_dist = abs(cur_i - self._move_target)
-                if total_dist == 0:
-                    move_progress_pct = 100
-                else:
-                    progress = (total_dist - remaining_dist) / total_dist * 100.0
-                    move_progress_pct = int(max(0.0, min(100.0, round(progress))))
+            estimated_total_s = round(self._move_profile.travel_time(0, 100), 2)
+
+            pos = self._interpolated_position()
+            if pos is None:
+                pos = cur_i
+            if pos is not None and self._move_target is not None:
+                estimated_remaining_s = round(self._move_profile.travel_time(pos, self._move_target), 2)
+
+                if self._move_start_pos is not None:
+                    # Progress in time, not distance: bands the motor crosses slowly weigh more
+                    total_s = self._move_profile.travel_time(self._move_start_pos, self._move_target)
+                    if total_s <= 0:
+                        move_progress_pct = 100
+                    else:
+                        progress = (total_s - estimated_remaining_s) / total_s * 100.0
+                        move_progress_pct = int(max(0.0, min(100.0, round(progress))))
 
         at_fav = None
-        if cur_i is not None and fav.get("position") is not None:
-            try:
-                at_fav = int(cur_i) == int(fav.get("position"))
-            except (TypeError, ValueError):
-                at_fav = None
+        if cur_i is not None and motor.fav_pos is not None:
+            at_fav = cur_i == motor.fav_pos
 
         return {
-            "enabled": motor.get("enabled"),
-            "motor_state": motor.get("state"),
+            "enabled": motor.enabled,
+            "motor_state": motor.state,
+            # The polled value, as always; estimated_position is interpolated while moving (like the cover's position)
             "current_position": cur_i,
-            "desired_position": des_i,
-            "favorite_position": fav.get("position"),
+            "estimated_position": self.current_cover_position,
+            "desired_position": motor.desired_pos,
             "at_favorite": at_fav,
-            "control_type": motor.get("controlType"),
-            "icon_set": motor.get("iconSet"),
-            "is_calibrated": calib.get("isCalibrated"),
-            "max_move_time_up_ms": calib.get("maxMoveTimeUpMs"),
-            "max_move_time_down_ms": calib.get("maxMoveTimeDownMs"),
+            # Static configuration (favorite, calibration, icon set) lives on diagnostic entities
             # movement metadata (any movement)
             "moving": self._tracked_moving,
             "move_direction": self._move_direction,
@@ -261,29 +277,25 @@ class BleBoxMotorCover(CoordinatorEntity[BleBoxCoordinator], CoverEntity):
         }
 
     async def async_open_cover(self, **kwargs: Any) -> None:
-        await self.coordinator.api.send_motor_command(self._channel, CMD_UP)
-        await self.coordinator.async_request_refresh()
+        await self._send(CMD_UP)
 
     async def async_close_cover(self, **kwargs: Any) -> None:
-        await self.coordinator.api.send_motor_command(self._channel, CMD_DOWN)
-        await self.coordinator.async_request_refresh()
+        await self._send(CMD_DOWN)
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
-        await self.coordinator.api.send_motor_command(self._channel, CMD_STOP)
-        await self.coordinator.async_request_refresh()
+        await self._send(CMD_STOP)
 
     async def async_favorite(self) -> None:
-        await self.coordinator.api.send_motor_command(self._channel, CMD_FAV)
-        await self.coordinator.async_request_refresh()
+        await self._send(CMD_FAV)
 
     async def async_next_step(self) -> None:
-        await self.coordinator.api.send_motor_command(self._channel, CMD_NEXT)
-        await self.coordinator.async_request_refresh()
+        await self._send(CMD_NEXT)
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """
         Emulate set position by moving and stopping when target reached.
         Position scale: 0=open, 100=closed
+        mode: closed_loop (poll while moving) or timed (stop on a timer, verify once)
         """
         target = kwargs.get("position")
         if target is None:
@@ -295,71 +307,56 @@ class BleBoxMotorCover(CoordinatorEntity[BleBoxCoordinator], CoverEntity):
             return
         target = max(0, min(100, target))
 
-        # Special-case endpoints for better accuracy
-        if target == 100:
-            tol = 0
-        elif target == 0:
-            tol = 0
-        else:
-            tol = POSITION_TOLERANCE
-
-        motor = self._motor()
-        if not motor:
-            return
-
-        cur = (motor.get("currentPos") or {}).get("position")
+        # One controller per channel: newer targets retarget or supersede this one
+        mode = kwargs.get("mode", MODE_CLOSED_LOOP)
         try:
-            cur_i = int(cur)
-        except (TypeError, ValueError):
-            cur_i = None
+            await self.coordinator.controller(self._channel).async_move_to(target, mode)
+        except DeviceOfflineError as e:
+            raise HomeAssistantError(f"{self.name}: {e}") from e
 
-        if cur_i is not None and abs(cur_i - target) <= POSITION_TOLERANCE:
-            return
+    async def async_trace_set_position(self, position: int, mode: str = MODE_CLOSED_LOOP) -> None:
+        """
+        Debug: set_position with a full timeline of the control loop, exported as JSON
+        to <config>/blebox_smartwindowbox_traces and kept for the diagnostics download.
+        """
+        target = max(0, min(100, int(position)))
+        controller = self.coordinator.controller(self._channel)
+        trace = MoveTrace(self._channel, target, mode)
+        try:
+            reached = await controller.async_move_to(target, mode, trace)
+        except DeviceOfflineError as e:
+            raise HomeAssistantError(f"{self.name}: {e}") from e
+
+        # Where the motor came to rest once it stopped coasting
+        await asyncio.sleep(TRACE_SETTLE_SEC)
+        final = None
+        sent = time.monotonic()
+        try:
+            motor = parse_window_state(await self.coordinator.api.window_extended_state()).motors.get(self._channel)
+        except BleBoxApiError as e:
+            trace.event("final_read", error=str(e))
+        else:
+            final = motor.current_pos if motor else None
+            trace.poll(sent, time.monotonic() - sent, final, motor.state if motor else None)
+        trace.finish(reached, final)
+
+        data = {"entity_id": self.entity_id, **trace.as_dict()}
+        controller.traces.append(data)
+        filename = f"{self.entity_id.replace('.', '_')}_{trace.started_at:%Y%m%dT%H%M%S}.json"
+        path = await self.hass.async_add_executor_job(
+            _write_trace, self.hass.config.path(TRACE_DIR), filename, data
+        )
+        _LOGGER.info(
+            "Move trace of %s (target %s, error %s) written to %s", self.entity_id, target, trace.result["error"], path
+        )
 
-        direction = "opening" if (cur_i is None or target < cur_i) else "closing"
-        command = CMD_UP if direction == "opening" else CMD_DOWN
-
-        # Timeout based on calibration full travel time + buffer
-        full_time_s = self._full_travel_time_s(motor, direction)
-        timeout_s = max(5.0, full_time_s + 5.0)
-
-        await self.coordinator.api.send_motor_command(self._channel, command)
-
-        start = time.monotonic()
-        while True:
-            if time.monotonic() - start > timeout_s:
-                await self.coordinator.api.send_motor_command(self._channel, CMD_STOP)
-                await self.coordinator.async_request_refresh()
-                return
-
-            await asyncio.sleep(POLL_INTERVAL_SEC)
-
-            # Poll direct for freshest position
-            data = await self.coordinator.api.window_extended_state()
-            motors = (data.get("window") or {}).get("motors") or []
-            m = next((mm for mm in motors if int(mm.get("id", -1)) == self._channel), None)
-            if not m:
-                continue
-
-            pos = (m.get("currentPos") or {}).get("position")
-            try:
-                pos_i = int(pos)
-            except (TypeError, ValueError):
-                continue
-
-            if direction == "opening":
-                # moving downward (toward 0): stop once we've reached/passed target
-                if pos_i <= target + tol:
-                    await self.coordinator.api.send_motor_command(self._channel, CMD_STOP)
-                    await asyncio.sleep(EXTRA_STOP_DELAY_SEC)
-                    await self.coordinator.api.send_motor_command(self._channel, CMD_STOP)
-                    await self.coordinator.async_request_refresh()
-                    return
-            else:
-                # closing upward (toward 100): stop once we've reached/passed target
-                if pos_i >= target - tol:
-                    await self.coordinator.api.send_motor_command(self._channel, CMD_STOP)
-                    await asyncio.sleep(EXTRA_STOP_DELAY_SEC)
-                    await self.coordinator.api.send_motor_command(self._channel, CMD_STOP)
-                    await self.coordinator.async_request_refresh()
-                    return
\ No newline at end of file
+    async def _send(self, command: str) -> None:
+        """Send a motor command and apply the state it returns (refresh only as a fallback)."""
+        # A direct command always wins over a set-position move in progress
+        self.coordinator.controller(self._channel).cancel()
+        try:
+            response = await self.coordinator.api.send_motor_command(self._channel, command)
+        except DeviceOfflineError as e:
+            # Fails at once instead of after a timeout; tell the user why
+            raise HomeAssistantError(f"{self.name}: {e}") from e
+        await self.coordinator.async_apply_command_response(self._channel, response)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_HOST
+
+TO_REDACT = {CONF_HOST, "ip"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    api = data["api"]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_s": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "motion_channels": coordinator.motion.active_channels,
+            "state_from_cache": coordinator.from_cache,
+            "device": async_redact_data(asdict(coordinator.device), TO_REDACT) if coordinator.device else None,
+        },
+        "health": api.health.as_dict(),
+        "transport": api.metrics.as_dict(),
+        "travel_profiles": coordinator.travel.as_dict(),
+        "usage": coordinator.usage.as_dict(),
+        "move_traces": {ch: list(c.traces) for ch, c in coordinator.controllers.items() if c.traces},
+        "state": async_redact_data(coordinator.data.raw, TO_REDACT) if coordinator.data else None,
+    }
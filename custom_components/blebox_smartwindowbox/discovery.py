@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+from collections.abc import Container, Iterable
+
+import aiohttp
+
+from .api import BleBoxSmartWindowBoxApi, BleBoxApiError, DeviceInfo
+from .const import (
+    DISCOVERY_MAX_PARALLEL,
+    DISCOVERY_MAX_HOSTS,
+    DISCOVERY_CONNECT_TIMEOUT_SEC,
+    DISCOVERY_TIMEOUT_SEC,
+)
+
+
+def parse_hosts(spec: str) -> list[str]:
+    """
+    Addresses to scan: a subnet ("192.168.1.0/24") or an inclusive range
+    ("192.168.1.10-192.168.1.80", or short "192.168.1.10-80").
+    Raises ValueError on anything else or on more than DISCOVERY_MAX_HOSTS addresses.
+    """
+    spec = spec.strip()
+    if "-" in spec:
+        first_s, last_s = (part.strip() for part in spec.split("-", 1))
+        first = ipaddress.IPv4Address(first_s)
+        if "." not in last_s:
+            last_s = first_s.rsplit(".", 1)[0] + "." + last_s
+        last = ipaddress.IPv4Address(last_s)
+        if last < first:
+            raise ValueError(f"{spec}: range ends before it starts")
+        count = int(last) - int(first) + 1
+        if count > DISCOVERY_MAX_HOSTS:
+            raise ValueError(f"{spec}: {count} addresses, at most {DISCOVERY_MAX_HOSTS} per scan")
+        return [str(first + i) for i in range(count)]
+
+    network = ipaddress.IPv4Network(spec, strict=False)
+    if network.num_addresses > DISCOVERY_MAX_HOSTS:
+        raise ValueError(f"{spec}: {network.num_addresses} addresses, at most {DISCOVERY_MAX_HOSTS} per scan")
+    return [str(ip) for ip in network.hosts()]
+
+
+def is_window_box(info: DeviceInfo) -> bool:
+    return "windowbox" in info.device_type.lower()
+
+
+async def async_scan(
+    session: aiohttp.ClientSession,
+    hosts: Iterable[str],
+    known_ids: Container[str] = (),
+) -> list[tuple[str, DeviceInfo]]:
+    """
+    Probe every address through /api/device/state, DISCOVERY_MAX_PARALLEL at a time.
+
+    Empty addresses cost at most DISCOVERY_CONNECT_TIMEOUT_SEC, so a /24 takes
+    a few seconds. Returns (host, info) of each window box whose id is not in
+    known_ids, in address order.
+    """
+    slots = asyncio.Semaphore(DISCOVERY_MAX_PARALLEL)
+
+    async def _probe(host: str) -> DeviceInfo | None:
+        api = BleBoxSmartWindowBoxApi(
+            session, host, timeout=DISCOVERY_TIMEOUT_SEC, connect_timeout=DISCOVERY_CONNECT_TIMEOUT_SEC
+        )
+        async with slots:
+            try:
+                info = await api.device_state()
+            except (BleBoxApiError, ValueError, AttributeError):
+                return None  # nothing there, or something that is not a BleBox
+        return info if info.device_id and is_window_box(info) else None
+
+    hosts = list(hosts)
+    found: list[tuple[str, DeviceInfo]] = []
+    seen: set[str] = set()
+    for host, info in zip(hosts, await asyncio.gather(*(_probe(host) for host in hosts))):
+        # A box on two addresses (e.g. LAN + WLAN) is listed once
+        if info is None or info.device_id in known_ids or info.device_id in seen:
+            continue
+        seen.add(info.device_id)
+        found.append((host, info))
+    return found
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, CONF_NAME, DEFAULT_NAME
+from .coordinator import BleBoxCoordinator
+
+
+def device_identifiers(entry: ConfigEntry) -> set[tuple[str, str]]:
+    return {(DOMAIN, entry.unique_id or entry.entry_id)}
+
+
+class BleBoxEntity(CoordinatorEntity[BleBoxCoordinator]):
+    """Base for every entity of one smartWindowBox config entry (one device)."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: BleBoxCoordinator, entry: ConfigEntry, context: Any = None) -> None:
+        super().__init__(coordinator, context)
+        self._entry_id = entry.entry_id
+        self._attr_device_info = DeviceInfo(
+            identifiers=device_identifiers(entry),
+            name=entry.data.get(CONF_NAME) or entry.title or DEFAULT_NAME,
+            manufacturer="BleBox",
+            model="smartWindowBox",
+            configuration_url=coordinator.api.base_url,
+        )
+        # Known from the cache (or an earlier setup); refreshed in the background after startup
+        device = coordinator.device
+        if device is not None:
+            if device.fw is not None:
+                self._attr_device_info["sw_version"] = str(device.fw)
+            if device.hw is not None:
+                self._attr_device_info["hw_version"] = str(device.hw)
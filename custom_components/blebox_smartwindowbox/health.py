@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from .const import (
+    HEALTH_OFFLINE_AFTER_FAILURES,
+    HEALTH_OFFLINE_MIN_SEC,
+    PROBE_INTERVAL_MIN_SEC,
+    PROBE_INTERVAL_MAX_SEC,
+)
+
+HEALTH_HEALTHY = "healthy"
+HEALTH_DEGRADED = "degraded"
+HEALTH_OFFLINE = "offline"
+HEALTH_STATES = [HEALTH_HEALTHY, HEALTH_DEGRADED, HEALTH_OFFLINE]
+
+
+class DeviceHealth:
+    """
+    Circuit breaker for one device.
+
+    healthy -> degraded on a failed request, -> offline after
+    HEALTH_OFFLINE_AFTER_FAILURES failures in a row over at least
+    HEALTH_OFFLINE_MIN_SEC. While offline nothing reaches the wire except one
+    read probe whenever the backoff has elapsed (doubling up to
+    PROBE_INTERVAL_MAX_SEC) and forced requests (STOP). Any answer makes it
+    healthy again.
+    """
+
+    def __init__(self) -> None:
+        self.state = HEALTH_HEALTHY
+        self.consecutive_failures = 0
+        self.changed_at = time.monotonic()
+        self.last_success: float | None = None
+        self.fast_fails = 0
+        self._probe_interval = PROBE_INTERVAL_MIN_SEC
+        self._probe_at = 0.0
+        self._probing = False
+        self._failing_since = 0.0
+
+    @property
+    def opens_on_failure(self) -> bool:
+        """Whether one more failed request would take the device offline."""
+        return (
+            self.state != HEALTH_OFFLINE
+            and self.consecutive_failures + 1 >= HEALTH_OFFLINE_AFTER_FAILURES
+            and time.monotonic() - self._failing_since >= HEALTH_OFFLINE_MIN_SEC
+        )
+
+    @property
+    def probe_in(self) -> float:
+        """Seconds until the next probe may go out (0 unless offline)."""
+        if self.state != HEALTH_OFFLINE:
+            return 0.0
+        return max(0.0, self._probe_at - time.monotonic())
+
+    def allow(self, probe: bool) -> bool:
+        """
+        Whether a request may go out now. While offline only a probe may, one at a time,
+        once the backoff has elapsed; the caller must report its outcome.
+        """
+        if self.state != HEALTH_OFFLINE:
+            return True
+        if probe and not self._probing and time.monotonic() >= self._probe_at:
+            self._probing = True
+            return True
+        self.fast_fails += 1
+        return False
+
+    def record_success(self) -> None:
+        self._probing = False
+        self.consecutive_failures = 0
+        self.last_success = time.monotonic()
+        self._probe_interval = PROBE_INTERVAL_MIN_SEC
+        self._set_state(HEALTH_HEALTHY)
+
+    def record_failure(self) -> None:
+        if not self.consecutive_failures:
+            self._failing_since = time.monotonic()
+        self.consecutive_failures += 1
+        if self.state == HEALTH_OFFLINE:
+            if self._probing:
+                self._probe_interval = min(PROBE_INTERVAL_MAX_SEC, self._probe_interval * 2)
+        elif (
+            self.consecutive_failures >= HEALTH_OFFLINE_AFTER_FAILURES
+            and time.monotonic() - self._failing_since >= HEALTH_OFFLINE_MIN_SEC
+        ):
+            self._probe_interval = PROBE_INTERVAL_MIN_SEC
+            self._set_state(HEALTH_OFFLINE)
+        else:
+            self._set_state(HEALTH_DEGRADED)
+        self._probing = False
+        if self.state == HEALTH_OFFLINE:
+            self._probe_at = time.monotonic() + self._probe_interval
+
+    def record_abandoned(self) -> None:
+        """A request ended without an outcome (e.g. preempted); a probe slot is released."""
+        self._probing = False
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            self.changed_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "state_age_s": round(now - self.changed_at, 1),
+            "last_success_age_s": round(now - self.last_success, 1) if self.last_success is not None else None,
+            "next_probe_in_s": round(self.probe_in, 1),
+            "fast_fails": self.fast_fails,
+        }
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import deque
+from typing import Any
+
+# Upper bounds (ms) of the latency histogram buckets; anything slower lands in "+inf"
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000)
+LATENCY_EWMA_RATE = 0.2
+RATE_WINDOW_SEC = 60.0
+# Round-trip estimator gains (as TCP, RFC 6298)
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+
+_COMMAND_PATH = re.compile(r"^/s/\d+/\w+$")
+
+
+def ewma(previous: float | None, sample: float, rate: float) -> float:
+    if previous is None:
+        return sample
+    return previous + rate * (sample - previous)
+
+
+def endpoint_key(path: str) -> str:
+    """Group per-channel command paths under one endpoint."""
+    if _COMMAND_PATH.match(path):
+        return "/s/{channel}/{command}"
+    return path
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total_ms", "max_ms", "ewma_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.ewma_ms: float | None = None
+
+    def record(self, ms: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                break
+        else:
+            i = len(LATENCY_BUCKETS_MS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.ewma_ms = ewma(self.ewma_ms, ms, LATENCY_EWMA_RATE)
+
+    def percentile(self, q: float) -> float | None:
+        """Bucket upper bound containing the q-th quantile (max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["+inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class RttEstimator:
+    """
+    Smoothed round trip and its variation for one endpoint, the way TCP derives
+    its retransmission timeout. A timeout doubles the derived timeout until the
+    next answer is measured.
+    """
+
+    __slots__ = ("srtt", "rttvar", "samples", "backoff")
+
+    def __init__(self) -> None:
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.samples = 0
+        self.backoff = 1
+
+    def record(self, seconds: float) -> None:
+        if self.srtt is None:
+            self.srtt = seconds
+            self.rttvar = seconds / 2
+        else:
+            self.rttvar += RTT_BETA * (abs(self.srtt - seconds) - self.rttvar)
+            self.srtt += RTT_ALPHA * (seconds - self.srtt)
+        self.samples += 1
+        self.backoff = 1
+
+    def record_timeout(self) -> None:
+        self.backoff = min(self.backoff * 2, 64)
+
+    def timeout(self, floor: float, ceiling: float) -> float:
+        """srtt + 4 * rttvar (backed off), within [floor, ceiling]; the ceiling until measured."""
+        if self.srtt is None:
+            return ceiling
+        return min(ceiling, max(floor, self.srtt + 4 * self.rttvar) * self.backoff)
+
+    def hedge_delay(self, floor: float, min_samples: int) -> float | None:
+        """How long a read may run before it is worth a second copy; None while too little is known."""
+        if self.srtt is None or self.samples < min_samples or self.backoff > 1:
+            return None
+        return max(floor, self.srtt + 2 * self.rttvar)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "srtt_ms": round(self.srtt * 1000.0, 1) if self.srtt is not None else None,
+            "rttvar_ms": round(self.rttvar * 1000.0, 1),
+            "samples": self.samples,
+            "backoff": self.backoff,
+        }
+
+
+class TransportMetrics:
+    """Per-device wire statistics, recorded by the API client and the coordinator."""
+
+    def __init__(self) -> None:
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.lock_wait = LatencyHistogram()
+        self.refresh = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.last_error: str | None = None
+        self._request_times: deque[float] = deque()
+        # Connection reuse (recorded by DeviceConnection / stale-socket retries)
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.stale_retries = 0
+        # Round trips behind the adaptive timeouts (per endpoint) and hedged reads
+        self.rtt: dict[str, RttEstimator] = {}
+        self.connect_rtt = RttEstimator()
+        self.hedged_reads = 0
+        self.hedge_wins = 0
+
+    def record_request(self, path: str, wait_s: float, latency_s: float | None, error: str | None = None) -> None:
+        now = time.monotonic()
+        self.requests += 1
+        self._request_times.append(now)
+        self._trim(now)
+        self.lock_wait.record(wait_s * 1000.0)
+        if latency_s is not None:
+            self.latency.setdefault(endpoint_key(path), LatencyHistogram()).record(latency_s * 1000.0)
+        if error is None and latency_s is not None:
+            self.rtt_for(path).record(latency_s)
+        if error == "timeout":
+            self.timeouts += 1
+            self.rtt_for(path).record_timeout()
+        elif error is not None:
+            self.errors += 1
+        if error is not None:
+            self.last_error = f"{endpoint_key(path)}: {error}"
+
+    def rtt_for(self, path: str) -> RttEstimator:
+        key = endpoint_key(path)
+        if key not in self.rtt:
+            self.rtt[key] = RttEstimator()
+        return self.rtt[key]
+
+    def record_refresh(self, duration_s: float) -> None:
+        self.refresh.record(duration_s * 1000.0)
+
+    def _trim(self, now: float) -> None:
+        while self._request_times and now - self._request_times[0] > RATE_WINDOW_SEC:
+            self._request_times.popleft()
+
+    @property
+    def requests_per_minute(self) -> float:
+        self._trim(time.monotonic())
+        return len(self._request_times) * 60.0 / RATE_WINDOW_SEC
+
+    @property
+    def connection_reuse_pct(self) -> float | None:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused * 100.0 / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "requests_per_minute": self.requests_per_minute,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "last_error": self.last_error,
+            "latency": {key: h.as_dict() for key, h in self.latency.items()},
+            "lock_wait": self.lock_wait.as_dict(),
+            "refresh": self.refresh.as_dict(),
+            "connections": {
+                "created": self.connections_created,
+                "reused": self.connections_reused,
+                "reuse_pct": self.connection_reuse_pct,
+                "stale_retries": self.stale_retries,
+                "connect_rtt": self.connect_rtt.as_dict(),
+            },
+            "rtt": {key: est.as_dict() for key, est in self.rtt.items()},
+            "hedging": {"hedged_reads": self.hedged_reads, "hedge_wins": self.hedge_wins},
+        }
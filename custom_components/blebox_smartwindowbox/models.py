@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_FULL_TRAVEL_MS = 40000
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True, frozen=True)
+class MotorState:
+    id: int
+    name: str | None
+    enabled: Any
+    state: int | None
+    current_pos: int | None
+    desired_pos: int | None
+    fav_pos: int | None
+    control_type: Any
+    icon_set: Any
+    is_calibrated: Any
+    max_move_time_up_ms: int | None
+    max_move_time_down_ms: int | None
+
+    # Your observed mapping:
+    # 0 closing (moving to 100)
+    # 1 opening (moving to 0)
+    # 2 idle at intermediate position (e.g. favorite)
+    # 3 idle at closed (100)
+    # 4 idle at open (0)
+    @property
+    def moving(self) -> bool:
+        return self.state in (0, 1)
+
+    def full_travel_time_s(self, direction: str) -> float:
+        ms = self.max_move_time_up_ms if direction == "opening" else self.max_move_time_down_ms
+        return max(1.0, (ms or DEFAULT_FULL_TRAVEL_MS) / 1000.0)
+
+
+@dataclass(slots=True, frozen=True)
+class SensorState:
+    id: int
+    type: str
+    value: Any
+    state: Any
+    trend: Any
+    icon_set: Any
+    # Ticks up on every poll; not a change worth a state write on its own
+    elapsed_time_s: Any = field(default=None, compare=False)
+
+
+@dataclass(slots=True)
+class WindowState:
+    """One parsed /api/window/extended/state payload."""
+
+    motors: dict[int, MotorState]
+    sensors: dict[tuple[str, int], SensorState]  # by (type, id): ids are only unique per type
+    raw: dict[str, Any]
+
+
+def parse_motor(m: dict[str, Any]) -> MotorState:
+    calib = m.get("calibrationParameters") or {}
+    return MotorState(
+        id=_int_or_none(m.get("id")) or 0,
+        name=m.get("name"),
+        enabled=m.get("enabled"),
+        state=_int_or_none(m.get("state")),
+        current_pos=_int_or_none((m.get("currentPos") or {}).get("position")),
+        desired_pos=_int_or_none((m.get("desiredPos") or {}).get("position")),
+        fav_pos=_int_or_none((m.get("favPos") or {}).get("position")),
+        control_type=m.get("controlType"),
+        icon_set=m.get("iconSet"),
+        is_calibrated=calib.get("isCalibrated"),
+        max_move_time_up_ms=_int_or_none(calib.get("maxMoveTimeUpMs")),
+        max_move_time_down_ms=_int_or_none(calib.get("maxMoveTimeDownMs")),
+    )
+
+
+def parse_sensor(s: dict[str, Any]) -> SensorState:
+    return SensorState(
+        id=_int_or_none(s.get("id")) or 0,
+        type=str(s.get("type")),
+        value=s.get("value"),
+        state=s.get("state"),
+        trend=s.get("trend"),
+        elapsed_time_s=s.get("elapsedTimeS"),
+        icon_set=s.get("iconSet"),
+    )
+
+
+def parse_window_state(data: dict[str, Any]) -> WindowState:
+    window = data.get("window") or {}
+    motors = (parse_motor(m) for m in window.get("motors") or [])
+    sensors = (parse_sensor(s) for s in window.get("sensors") or [])
+    return WindowState(
+        motors={m.id: m for m in motors},
+        sensors={(s.type, s.id): s for s in sensors},
+        raw=data,
+    )
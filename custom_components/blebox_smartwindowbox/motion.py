@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable
+
+from .api import BleBoxSmartWindowBoxApi, BleBoxApiError
+from .const import POLL_INTERVAL_SEC
+from .models import MotorState, parse_motor
+
+
+class MotionSubscription:
+    """One waiting set-position run; receives its channel's motor record every tick."""
+
+    def __init__(self, tracker: MotionTracker, channel: int) -> None:
+        self._tracker = tracker
+        self.channel = channel
+        self._event = asyncio.Event()
+        self._motor: MotorState | None = None
+        self._error: BleBoxApiError | None = None
+        self.sampled_at: float | None = None  # monotonic midpoint of the request that produced the record
+
+    async def __aenter__(self) -> MotionSubscription:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._tracker._unsubscribe(self)
+
+    def _deliver(
+        self,
+        motor: MotorState | None,
+        sampled_at: float | None = None,
+        error: BleBoxApiError | None = None,
+    ) -> None:
+        # Latest-only: a slow consumer skips stale ticks instead of queueing them
+        self._motor = motor
+        self.sampled_at = sampled_at
+        self._error = error
+        self._event.set()
+
+    async def next(self) -> MotorState | None:
+        """Wait for the next tick. Returns None if the channel was missing from the payload."""
+        await self._event.wait()
+        self._event.clear()
+        if self._error is not None:
+            raise self._error
+        return self._motor
+
+
+class MotionTracker:
+    """
+    Per-device poller shared by all active set-position runs.
+    Fetches the extended state once per tick and fans each motor record out
+    to the subscriptions of its channel. Runs only while someone is subscribed.
+    """
+
+    def __init__(self, api: BleBoxSmartWindowBoxApi, interval: float = POLL_INTERVAL_SEC) -> None:
+        self._api = api
+        self._interval = interval
+        self._subscribers: dict[int, set[MotionSubscription]] = {}
+        self._task: asyncio.Task | None = None
+        self.last_latency_s: float | None = None
+        # Called with every tick's motor records and their sample time (travel-time learning)
+        self.on_sample: Callable[[dict[int, MotorState], float], None] | None = None
+
+    @property
+    def active_channels(self) -> list[int]:
+        return sorted(self._subscribers)
+
+    def subscribe(self, channel: int) -> MotionSubscription:
+        sub = MotionSubscription(self, channel)
+        self._subscribers.setdefault(channel, set()).add(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return sub
+
+    def _unsubscribe(self, sub: MotionSubscription) -> None:
+        subs = self._subscribers.get(sub.channel)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            self._subscribers.pop(sub.channel, None)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self._interval)
+            if not self._subscribers:
+                break
+
+            sent = time.monotonic()
+            try:
+                data = await self._api.window_extended_state()
+            except BleBoxApiError as e:
+                for subs in list(self._subscribers.values()):
+                    for sub in list(subs):
+                        sub._deliver(None, error=e)
+                continue
+            received = time.monotonic()
+            self.last_latency_s = received - sent
+            sampled_at = (sent + received) / 2
+
+            motors = {m.id: m for m in map(parse_motor, (data.get("window") or {}).get("motors") or [])}
+            if self.on_sample is not None:
+                self.on_sample(motors, sampled_at)
+            for channel, subs in list(self._subscribers.items()):
+                motor = motors.get(channel)
+                for sub in list(subs):
+                    sub._deliver(motor, sampled_at)
+
+    def async_stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
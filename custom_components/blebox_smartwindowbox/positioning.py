@@ -0,0 +1,513 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from .api import BleBoxApiError
+from .const import (
+    CMD_UP,
+    CMD_DOWN,
+    CMD_STOP,
+    POSITION_TOLERANCE,
+    POLL_INTERVAL_SEC,
+    MOVE_MAX_FAILED_POLLS,
+    EXTRA_STOP_DELAY_SEC,
+    SPEED_SAMPLE_WINDOW,
+    STOP_LATENCY_DEFAULT_SEC,
+    LATENCY_LEARN_RATE,
+    COAST_LEARN_RATE,
+    COAST_MAX_PCT,
+    COAST_SETTLE_TICKS,
+    TARGET_DEBOUNCE_SEC,
+    MODE_CLOSED_LOOP,
+    MODE_TIMED,
+    TIMED_MAX_CORRECTIONS,
+    TIMED_SETTLE_SEC,
+    TIMED_ENDPOINT_MARGIN,
+    TRACE_HISTORY,
+)
+from .metrics import ewma
+from .models import MotorState
+from .motion import MotionSubscription
+from .trace import NULL_TRACE, MoveTrace
+
+if TYPE_CHECKING:
+    from .coordinator import BleBoxCoordinator
+
+
+class StopPredictor:
+    """
+    Decides when to send STOP so the motor comes to rest on the target.
+
+    Speed comes from recent (time, position) samples, blended with the
+    calibrated full-travel time while there are too few samples. The STOP
+    is sent early by the command latency plus the learned coasting distance.
+    """
+
+    def __init__(
+        self,
+        target: int,
+        direction: str,
+        full_time_s: float,
+        coast_pct: float = 0.0,
+        latency_s: float | None = None,
+    ) -> None:
+        self.target = target
+        self.direction = direction
+        self.calibrated_speed = 100.0 / full_time_s  # %/s
+        self.coast_pct = coast_pct
+        self.latency_s = STOP_LATENCY_DEFAULT_SEC if latency_s is None else latency_s
+        self._sign = -1 if direction == "opening" else 1
+        self._samples: deque[tuple[float, int]] = deque(maxlen=SPEED_SAMPLE_WINDOW)
+
+    def add_sample(self, t: float, position: int) -> None:
+        self._samples.append((t, position))
+
+    @property
+    def speed(self) -> float:
+        """Estimated speed toward the target in %/s."""
+        if len(self._samples) >= 2:
+            (t0, p0), (t1, p1) = self._samples[0], self._samples[-1]
+            dt = t1 - t0
+            observed = self._sign * (p1 - p0) / dt if dt > 0 else 0.0
+            if observed > 0:
+                weight = (len(self._samples) - 1) / (SPEED_SAMPLE_WINDOW - 1)
+                return weight * observed + (1.0 - weight) * self.calibrated_speed
+        return self.calibrated_speed
+
+    def remaining(self, position: int) -> float:
+        """Distance still to travel (negative once past the target)."""
+        return self._sign * (self.target - position)
+
+    def position_at(self, t: float) -> float | None:
+        """Extrapolate the position at time t from the latest sample."""
+        if not self._samples:
+            return None
+        t1, p1 = self._samples[-1]
+        return p1 + self._sign * self.speed * (t - t1)
+
+    def stop_delay(self, now: float) -> float | None:
+        """
+        Seconds from now until STOP should be sent (<= 0: send it now).
+        The motor keeps moving for latency_s after sending and then coasts coast_pct.
+        """
+        if not self._samples:
+            return None
+        t1, p1 = self._samples[-1]
+        time_to_target = (self.remaining(p1) - self.coast_pct) / self.speed
+        return time_to_target - self.latency_s - (now - t1)
+
+    def learn_coast(self, predicted_stop_pos: float, final_pos: int) -> float:
+        """Fold the observed drift past the predicted stop point into coast_pct."""
+        drift = self._sign * (final_pos - predicted_stop_pos)
+        self.coast_pct = max(0.0, min(COAST_MAX_PCT, ewma(self.coast_pct, drift, COAST_LEARN_RATE)))
+        return self.coast_pct
+
+
+def _direction(current: int | None, target: int) -> str:
+    return "opening" if (current is None or target < current) else "closing"
+
+
+def _tolerance(target: int) -> int:
+    # Endpoints: run into the end stop for better accuracy
+    return 0 if target in (0, 100) else POSITION_TOLERANCE
+
+
+class MoveRequest:
+    """
+    One set-position request. done: True once reached, False if superseded or cancelled.
+    started resolves once the start command was acknowledged (or the request ended without one).
+    """
+
+    def __init__(self, target: int, mode: str = MODE_CLOSED_LOOP, trace: MoveTrace | None = None) -> None:
+        self.target = target
+        self.mode = mode
+        self.trace = trace or NULL_TRACE
+        self.requested_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        self.started: asyncio.Future[None] = loop.create_future()
+        self.done: asyncio.Future[bool] = loop.create_future()
+
+    def mark_started(self) -> None:
+        if not self.started.done():
+            self.started.set_result(None)
+
+    def finish(self, reached: bool) -> None:
+        self.mark_started()
+        if not self.done.done():
+            self.done.set_result(reached)
+
+    def fail(self, err: Exception) -> None:
+        self.mark_started()
+        if not self.done.done():
+            self.done.set_exception(err)
+
+
+class ChannelController:
+    """
+    The one place that moves a channel to a target position.
+
+    A long-lived task takes the latest requested target once it has been quiet
+    for TARGET_DEBOUNCE_SEC (slider drags fire many calls). A new target in the
+    current direction of travel and mode is adopted in place; anything else
+    stops the motor and starts a fresh move. cancel() aborts the move for a
+    user STOP.
+    """
+
+    def __init__(self, coordinator: BleBoxCoordinator, channel: int) -> None:
+        self._coordinator = coordinator
+        self._channel = channel
+
+        # Predictive stop calibration, learned across moves
+        self.coast_pct: float = 0.0
+        self.stop_latency_s: float | None = None
+
+        self._pending: MoveRequest | None = None
+        self._active: MoveRequest | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._move_task: asyncio.Task | None = None
+        self._move_cancelled = False
+
+        # Timeline of the running move (NULL_TRACE unless traced) and the last few finished ones
+        self._trace: MoveTrace = NULL_TRACE
+        self.traces: deque[dict[str, Any]] = deque(maxlen=TRACE_HISTORY)
+
+    @property
+    def busy(self) -> bool:
+        return self._pending is not None or self._active is not None
+
+    async def async_move_to(
+        self, target: int, mode: str = MODE_CLOSED_LOOP, trace: MoveTrace | None = None
+    ) -> bool:
+        """Request a target and wait until it is reached (True) or superseded/cancelled (False)."""
+        req = self.request(target, mode, trace)
+        # Shielded: a caller going away must not cancel the controller's bookkeeping
+        return await asyncio.shield(req.done)
+
+    def request(
+        self, target: int, mode: str = MODE_CLOSED_LOOP, trace: MoveTrace | None = None, immediate: bool = False
+    ) -> MoveRequest:
+        """
+        Queue a target without waiting for it. immediate skips the debounce
+        (for programmatic callers that send one final target, e.g. batch moves).
+        """
+        req = MoveRequest(max(0, min(100, target)), mode, trace)
+        if immediate:
+            req.requested_at -= TARGET_DEBOUNCE_SEC
+        if self._pending is not None:
+            self._pending.finish(False)
+        self._pending = req
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return req
+
+    def cancel(self) -> None:
+        """Drop the pending target and abort the running move (the caller sends STOP)."""
+        if self._pending is not None:
+            self._pending.finish(False)
+            self._pending = None
+        if self._move_task is not None and not self._move_task.done():
+            self._move_cancelled = True
+            self._move_task.cancel()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def _quiet_pending(self) -> MoveRequest | None:
+        """The pending request, once no newer target arrived for the debounce period."""
+        req = self._pending
+        if req is None or time.monotonic() - req.requested_at < TARGET_DEBOUNCE_SEC:
+            return None
+        return req
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending is not None:
+                wait = self._pending.requested_at + TARGET_DEBOUNCE_SEC - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+
+                self._active, self._pending = self._pending, None
+                self._move_cancelled = False
+                self._trace = self._active.trace
+                self._move_task = asyncio.ensure_future(self._move())
+                try:
+                    reached = await self._move_task
+                    # Re-read _active: the move may have adopted a newer request
+                    self._active.finish(reached)
+                except asyncio.CancelledError:
+                    self._trace.event("cancelled")
+                    self._active.finish(False)
+                    # Only a cancel() of the move is absorbed; shutdown() cancels this task too
+                    if not self._move_cancelled or asyncio.current_task().cancelling():
+                        raise
+                except Exception as e:  # noqa: BLE001 - surfaced to the caller, the controller lives on
+                    self._trace.event("error", error=str(e))
+                    self._active.fail(e)
+                finally:
+                    self._active = None
+                    self._move_task = None
+                    self._trace = NULL_TRACE
+
+    async def _move(self) -> bool:
+        """Run the active request to its target. Returns False if a reversal superseded it."""
+        req = self._active
+        assert req is not None
+        data = self._coordinator.data
+        motor = data.motors.get(self._channel) if data else None
+        if motor is None:
+            return False
+
+        cur_i = motor.current_pos
+        self._trace.event("request", position=cur_i, target=req.target, mode=req.mode)
+        if cur_i is not None and abs(cur_i - req.target) <= POSITION_TOLERANCE:
+            return True
+        if req.mode == MODE_TIMED:
+            return await self._move_timed(req, motor)
+
+        direction = _direction(cur_i, req.target)
+        command = CMD_UP if direction == "opening" else CMD_DOWN
+
+        # Timeout based on calibration full travel time + buffer
+        full_time_s = motor.full_travel_time_s(direction)
+        timeout_s = max(5.0, full_time_s + 5.0)
+
+        # Learned speed over this stretch as the prior until the move's own samples take over
+        distance = abs(req.target - cur_i) if cur_i is not None else 0
+        prior_s = full_time_s
+        if distance:
+            prior_s = self._coordinator.travel.profile(motor, direction).travel_time(cur_i, req.target) * 100 / distance
+        predictor = StopPredictor(req.target, direction, prior_s, self.coast_pct, self.stop_latency_s)
+        tol = _tolerance(req.target)
+        reached = True
+        self._trace.event(
+            "plan",
+            direction=direction,
+            prior_speed_pct_s=round(predictor.calibrated_speed, 3),
+            coast_pct=round(self.coast_pct, 2),
+            stop_latency_ms=round(predictor.latency_s * 1000.0, 1),
+        )
+
+        await self._send_timed(command)
+        req.mark_started()
+
+        start = time.monotonic()
+        failed_polls = 0
+        # One shared poll per device tick, however many channels are moving
+        async with self._coordinator.motion.subscribe(self._channel) as sub:
+            while True:
+                if time.monotonic() - start > timeout_s:
+                    self._trace.event("stop_decision", reason="timeout")
+                    await self._send(CMD_STOP)
+                    return False
+
+                try:
+                    m = await sub.next()
+                except BleBoxApiError as e:
+                    # A lost poll costs one tick; only a device that stays silent ends the move
+                    failed_polls += 1
+                    self._trace.event("poll_failed", error=str(e))
+                    # Give up before the breaker would open: it fast-fails the polls from then on
+                    if failed_polls < MOVE_MAX_FAILED_POLLS and not self._coordinator.api.health.opens_on_failure:
+                        continue
+                    self._trace.event("stop_decision", reason="no_answer")
+                    try:
+                        await self._send(CMD_STOP)
+                    except BleBoxApiError:
+                        pass
+                    raise
+                failed_polls = 0
+                pos_i = m.current_pos if m else None
+                self._trace.poll(sub.sampled_at, self._coordinator.motion.last_latency_s, pos_i, m.state if m else None)
+                if pos_i is None:
+                    continue
+                predictor.add_sample(sub.sampled_at or time.monotonic(), pos_i)
+                reason = None
+
+                newer = self._quiet_pending()
+                if newer is not None:
+                    ahead = (newer.target - pos_i) * (1 if direction == "closing" else -1)
+                    if ahead <= _tolerance(newer.target) or newer.mode != req.mode:
+                        # Reversal, already there, or another mode: stop here, the run loop starts the new move
+                        reached = False
+                        reason = "superseded"
+                        break
+                    # Same direction: retarget in place
+                    self._trace.event("retarget", target=newer.target)
+                    self._pending = None
+                    req.finish(False)
+                    req = self._active = newer
+                    req.mark_started()
+                    predictor.target = req.target
+                    tol = _tolerance(req.target)
+                    start = time.monotonic()
+
+                # reached/passed target (opening: toward 0, closing: toward 100)
+                if predictor.remaining(pos_i) <= tol:
+                    reason = "reached"
+                    break
+
+                # Endpoints: the motor stops itself at its limit, so only intermediate targets are predicted
+                if 0 < req.target < 100:
+                    delay = predictor.stop_delay(time.monotonic())
+                    # STOP falls due before the next sample would arrive: time it precisely instead
+                    next_sample_s = POLL_INTERVAL_SEC + (self._coordinator.motion.last_latency_s or 0.0)
+                    if delay is not None and delay < next_sample_s:
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        reason = "predicted"
+                        break
+
+            stop_sent = time.monotonic()
+            predicted_stop = predictor.position_at(stop_sent + predictor.latency_s)
+            self._trace.event(
+                "stop_decision",
+                reason=reason,
+                last_position=pos_i,
+                speed_pct_s=round(predictor.speed, 3),
+                predicted_stop=round(predicted_stop, 2) if predicted_stop is not None else None,
+            )
+            await self._send_timed(CMD_STOP)
+            await asyncio.sleep(EXTRA_STOP_DELAY_SEC)
+            # Applied now: the settle ticks below are newer and must not be overwritten by it
+            await self._send(CMD_STOP)
+
+            if reached and 0 < req.target < 100 and predicted_stop is not None:
+                await self._learn_coasting(sub, predictor, predicted_stop, stop_sent)
+
+        return reached
+
+    async def _move_timed(self, req: MoveRequest, motor: MotorState) -> bool:
+        """
+        Open loop: run for the time the travel model predicts, STOP on a timer and
+        read the position once afterwards, with a corrective move if it is off.
+        Nothing is polled while the motor runs.
+        """
+        coordinator = self._coordinator
+        coordinator.quiet_channels.add(self._channel)
+        try:
+            pos = motor.current_pos
+            for _ in range(TIMED_MAX_CORRECTIONS + 1):
+                if pos is not None and abs(pos - req.target) <= _tolerance(req.target):
+                    return True
+                direction = _direction(pos, req.target)
+                sign = -1 if direction == "opening" else 1
+                profile = coordinator.travel.profile(motor, direction)
+                endpoint = req.target in (0, 100)
+                start = pos if pos is not None else (100 if direction == "opening" else 0)
+
+                if endpoint:
+                    # The motor stops itself at its limit; just give it time to get there
+                    run_s = profile.travel_time(start, req.target) * TIMED_ENDPOINT_MARGIN
+                else:
+                    # Start and stop latency cancel out; only the coasting distance is stopped early for
+                    coast_from = req.target - sign * self.coast_pct
+                    run_s = profile.travel_time(start, req.target) - profile.travel_time(coast_from, req.target)
+
+                self._trace.event(
+                    "plan", direction=direction, run_s=round(run_s, 3), coast_pct=round(self.coast_pct, 2)
+                )
+                sent = time.monotonic()
+                await self._send_timed(CMD_UP if direction == "opening" else CMD_DOWN)
+                req.mark_started()
+                superseded = not await self._sleep_until(sent + run_s)
+
+                predicted_stop = None
+                if not endpoint or superseded:
+                    predicted_stop = profile.position_after(start, time.monotonic() - sent, sign)
+                    self._trace.event(
+                        "stop_decision",
+                        reason="superseded" if superseded else "timer",
+                        predicted_stop=round(predicted_stop, 2),
+                    )
+                    await self._send_timed(CMD_STOP)
+                    await asyncio.sleep(EXTRA_STOP_DELAY_SEC)
+                    await self._command(CMD_STOP)
+                if superseded:
+                    await self._verify()
+                    return False
+
+                await asyncio.sleep(TIMED_SETTLE_SEC)
+                motor = await self._verify() or motor
+                pos = motor.current_pos
+                if predicted_stop is not None and pos is not None and not motor.moving:
+                    drift = sign * (pos - predicted_stop)
+                    self.coast_pct = max(0.0, min(COAST_MAX_PCT, ewma(self.coast_pct, drift, COAST_LEARN_RATE)))
+                    self._trace.event("settled", position=pos, coast_pct=round(self.coast_pct, 2))
+            return pos is not None and abs(pos - req.target) <= _tolerance(req.target)
+        finally:
+            coordinator.quiet_channels.discard(self._channel)
+
+    async def _sleep_until(self, deadline: float) -> bool:
+        """Sleep until deadline. False if a newer target arrived first (it supersedes a timed move)."""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            await asyncio.sleep(min(remaining, TARGET_DEBOUNCE_SEC))
+            if self._quiet_pending() is not None:
+                return False
+
+    async def _verify(self) -> MotorState | None:
+        """The one state read of a timed move; applied like a command response."""
+        sent = time.monotonic()
+        payload = await self._coordinator.api.window_extended_state()
+        received = time.monotonic()
+        await self._coordinator.async_apply_command_response(self._channel, payload)
+        data = self._coordinator.data
+        motor = data.motors.get(self._channel) if data else None
+        self._trace.poll(
+            (sent + received) / 2,
+            received - sent,
+            motor.current_pos if motor else None,
+            motor.state if motor else None,
+        )
+        return motor
+
+    async def _command(self, command: str) -> dict[str, Any]:
+        sent = time.monotonic()
+        response = await self._coordinator.api.send_motor_command(self._channel, command)
+        self._trace.command(command, sent, time.monotonic())
+        return response
+
+    async def _send(self, command: str) -> None:
+        response = await self._command(command)
+        await self._coordinator.async_apply_command_response(self._channel, response)
+
+    async def _send_timed(self, command: str) -> dict[str, Any]:
+        """Send a motor command and fold half its round-trip into the STOP latency estimate."""
+        sent = time.monotonic()
+        response = await self._command(command)
+        self.stop_latency_s = ewma(self.stop_latency_s, (time.monotonic() - sent) / 2, LATENCY_LEARN_RATE)
+        return response
+
+    async def _learn_coasting(
+        self, sub: MotionSubscription, predictor: StopPredictor, predicted_stop: float, stop_sent: float
+    ) -> None:
+        """Watch a few more ticks for where the motor came to rest and update the coasting estimate."""
+        for _ in range(COAST_SETTLE_TICKS):
+            try:
+                m = await sub.next()
+            except BleBoxApiError:
+                return
+            self._trace.poll(
+                sub.sampled_at,
+                self._coordinator.motion.last_latency_s,
+                m.current_pos if m else None,
+                m.state if m else None,
+            )
+            if m is None or m.current_pos is None or m.moving or (sub.sampled_at or 0.0) <= stop_sent:
+                continue
+            self.coast_pct = predictor.learn_coast(predicted_stop, m.current_pos)
+            self._trace.event("settled", position=m.current_pos, coast_pct=round(self.coast_pct, 2))
+            return
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .api import BleBoxApiError, BleBoxHttpError
+from .const import CMD_DOWN, EVENT_RAIN_DETECTED
+from .coordinator import BleBoxCoordinator
+from .scheduler import PollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _raining(coordinator: BleBoxCoordinator) -> dict[int, bool]:
+    data = coordinator.data
+    if data is None:
+        return {}
+    return {s.id: s.value == 1 for s in data.sensors.values() if s.type == "rain"}
+
+
+class RainWatcher:
+    """
+    Rain lane of one device: polls only the sensors, at its own cadence, and
+    reacts to rain starting (event + optional close commands) within one tick.
+
+    Edges are detected on every coordinator update, so rain seen by the regular
+    refresh counts as well. The loop merely gets sensor changes in sooner. With
+    a scheduler its polls sit on the device's phase and share the domain-wide
+    cap with the regular refreshes.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: BleBoxCoordinator,
+        interval: float,
+        close_channels: list[int],
+        scheduler: PollScheduler | None = None,
+    ) -> None:
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._interval = interval
+        self._close_channels = close_channels
+        self._scheduler = scheduler
+        self._task: asyncio.Task | None = None
+        self._use_extended = False  # /api/window/state did not carry the sensors
+        # First observation sets the baseline: rain at startup is not an edge
+        self._raining = _raining(coordinator)
+        self._unsub = coordinator.async_add_listener(self._async_check_edges, ("rain", None))
+
+    def start(self) -> None:
+        if self._interval > 0 and self._raining and self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._run(), f"{EVENT_RAIN_DETECTED} {self._entry.title}"
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        self._unsub()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            if self._scheduler is None:
+                await asyncio.sleep(self._interval)
+                payload = await self._fetch()
+            else:
+                await asyncio.sleep(self._scheduler.align(self._entry.entry_id, self._interval))
+                async with self._scheduler.slot():
+                    payload = await self._fetch()
+            if payload is None:
+                continue
+            sensors = (payload.get("window") or {}).get("sensors")
+            if sensors is None:
+                if not self._use_extended:
+                    _LOGGER.debug("%s: no sensors in /api/window/state, using the extended state", self._entry.title)
+                    self._use_extended = True
+                continue
+            self._coordinator.async_apply_sensor_states(sensors)
+
+    async def _fetch(self) -> dict[str, Any] | None:
+        api = self._coordinator.api
+        try:
+            return await (api.window_extended_state() if self._use_extended else api.window_state())
+        except BleBoxHttpError as e:
+            if not self._use_extended:
+                # Firmware without the compact endpoint
+                _LOGGER.debug("%s: /api/window/state failed (%s), using the extended state", self._entry.title, e)
+                self._use_extended = True
+            return None
+        except BleBoxApiError:
+            return None  # health/backoff is handled by the API; the next tick tries again
+
+    @callback
+    def _async_check_edges(self) -> None:
+        raining = _raining(self._coordinator)
+        started = [sid for sid, on in raining.items() if on and self._raining.get(sid) is False]
+        self._raining = {**self._raining, **raining}
+        for sensor_id in started:
+            self._async_rain_started(sensor_id)
+
+    @callback
+    def _async_rain_started(self, sensor_id: int) -> None:
+        event_data: dict[str, Any] = {
+            "entry_id": self._entry.entry_id,
+            "name": self._entry.title,
+            "sensor_id": sensor_id,
+            "close_channels": self._close_channels,
+        }
+        self._hass.bus.async_fire(EVENT_RAIN_DETECTED, event_data)
+        for channel in self._close_channels:
+            self._hass.async_create_task(self._async_close(channel))
+
+    async def _async_close(self, channel: int) -> None:
+        # Rain wins over any set-position move in progress
+        self._coordinator.controller(channel).cancel()
+        try:
+            response = await self._coordinator.api.send_motor_command(channel, CMD_DOWN)
+        except BleBoxApiError as e:
+            _LOGGER.warning("%s: closing channel %s on rain failed: %s", self._entry.title, channel, e)
+            return
+        self._coordinator.usage.record_rain_close(channel)
+        await self._coordinator.async_apply_command_response(channel, response)
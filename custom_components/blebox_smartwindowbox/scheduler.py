@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from .const import MAX_CONCURRENT_POLLS, POLL_JITTER_FRACTION
+
+
+class PollScheduler:
+    """
+    Shared by all config entries of the domain.
+    Gives every device its own phase within the poll interval so refreshes are
+    spread out instead of firing in sync, and caps how many run at once.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_POLLS, jitter: float = POLL_JITTER_FRACTION) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._jitter = jitter
+        self._members: list[str] = []
+        self._random = random.Random()
+        self.active = 0
+        self.waiting = 0
+
+    def register(self, key: str) -> None:
+        if key not in self._members:
+            self._members.append(key)
+
+    def unregister(self, key: str) -> None:
+        if key in self._members:
+            self._members.remove(key)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def phase(self, key: str) -> float:
+        """Fraction of the interval this device's polls are placed at."""
+        if key not in self._members:
+            return 0.0
+        return self._members.index(key) / len(self._members)
+
+    def align(self, key: str, interval: float) -> float:
+        """
+        Delay for the next poll: about `interval` from now, moved onto this device's
+        phase (by at most half an interval) plus a little jitter.
+        """
+        count = max(1, len(self._members))
+        slot = self.phase(key) * interval
+        due = time.monotonic() + interval
+        shift = (slot - due % interval) % interval
+        if shift > interval / 2:
+            shift -= interval
+        jitter = self._random.uniform(-self._jitter, self._jitter) * interval / count
+        return max(interval / 2, interval + shift + jitter)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the domain-wide concurrent poll slots (granted in FIFO order)."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
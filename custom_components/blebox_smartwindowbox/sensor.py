@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import BleBoxCoordinator
+from .entity import BleBoxEntity
+from .health import HEALTH_STATES
+from .metrics import TransportMetrics
+from .models import MotorState
+from .usage import MotorUsage
+
+
+def _ewma_ms(metrics: TransportMetrics, endpoint: str) -> float | None:
+    hist = metrics.latency.get(endpoint)
+    return hist.ewma_ms if hist else None
+
+
+# key, name, unit, state class, enabled by default, value
+# Latencies and rates change on almost every refresh: opt-in, so they don't fill the recorder
+_METRICS: tuple[
+    tuple[str, str, str | None, SensorStateClass, bool, Callable[[TransportMetrics], float | None]], ...
+] = (
+    (
+        "state_latency",
+        "State request latency",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        False,
+        lambda m: _ewma_ms(m, "/api/window/extended/state"),
+    ),
+    (
+        "command_latency",
+        "Command latency",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        False,
+        lambda m: _ewma_ms(m, "/s/{channel}/{command}"),
+    ),
+    (
+        "queue_wait",
+        "Request queue wait",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        False,
+        lambda m: m.lock_wait.ewma_ms,
+    ),
+    (
+        "refresh_duration",
+        "Refresh duration",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        False,
+        lambda m: m.refresh.ewma_ms,
+    ),
+    (
+        "requests_per_minute",
+        "Requests per minute",
+        "req/min",
+        SensorStateClass.MEASUREMENT,
+        False,
+        lambda m: m.requests_per_minute,
+    ),
+    (
+        "connection_reuse",
+        "Connection reuse",
+        PERCENTAGE,
+        SensorStateClass.MEASUREMENT,
+        False,
+        lambda m: m.connection_reuse_pct,
+    ),
+    ("request_errors", "Request errors", None, SensorStateClass.TOTAL_INCREASING, True, lambda m: m.errors),
+    (
+        "request_timeouts",
+        "Request timeouts",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        True,
+        lambda m: m.timeouts,
+    ),
+)
+
+
+def _seconds(ms: int | None) -> float | None:
+    return ms / 1000.0 if ms is not None else None
+
+
+# key, name, unit, device class, enabled by default, value
+_MOTOR_CONFIG: tuple[
+    tuple[str, str, str | None, SensorDeviceClass | None, bool, Callable[[MotorState], Any]], ...
+] = (
+    ("favorite_position", "Favorite position", PERCENTAGE, None, True, lambda m: m.fav_pos),
+    (
+        "travel_time_up",
+        "Travel time up",
+        UnitOfTime.SECONDS,
+        SensorDeviceClass.DURATION,
+        True,
+        lambda m: _seconds(m.max_move_time_up_ms),
+    ),
+    (
+        "travel_time_down",
+        "Travel time down",
+        UnitOfTime.SECONDS,
+        SensorDeviceClass.DURATION,
+        True,
+        lambda m: _seconds(m.max_move_time_down_ms),
+    ),
+    ("control_type", "Control type", None, None, False, lambda m: m.control_type),
+    ("icon_set", "Icon set", None, None, False, lambda m: m.icon_set),
+)
+
+
+# key, name, unit, device class, value (running totals, never decreasing)
+_MOTOR_USAGE: tuple[tuple[str, str, str | None, SensorDeviceClass | None, Callable[[MotorUsage], Any]], ...] = (
+    ("cycles", "Cycles", None, None, lambda u: u.cycles),
+    ("travel_opening", "Travel opening", PERCENTAGE, None, lambda u: round(u.travel_opening_pct, 1)),
+    ("travel_closing", "Travel closing", PERCENTAGE, None, lambda u: round(u.travel_closing_pct, 1)),
+    ("run_time", "Run time", UnitOfTime.HOURS, SensorDeviceClass.DURATION, lambda u: round(u.run_time_s / 3600, 3)),
+    ("stops", "Stops mid-travel", None, None, lambda u: u.stops),
+    ("reversals", "Reversals", None, None, lambda u: u.reversals),
+    ("rain_closes", "Rain closes", None, None, lambda u: u.rain_closes),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    coordinator: BleBoxCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    entities: list[SensorEntity] = [
+        BleBoxMetricSensor(coordinator, entry, key, name, unit, state_class, enabled, value_fn)
+        for key, name, unit, state_class, enabled, value_fn in _METRICS
+    ]
+    entities.append(BleBoxHealthSensor(coordinator, entry))
+    for channel in coordinator.data.motors:
+        entities.extend(
+            BleBoxMotorConfigSensor(coordinator, entry, channel, key, name, unit, device_class, enabled, value_fn)
+            for key, name, unit, device_class, enabled, value_fn in _MOTOR_CONFIG
+        )
+        entities.extend(
+            BleBoxMotorUsageSensor(coordinator, entry, channel, key, name, unit, device_class, value_fn)
+            for key, name, unit, device_class, value_fn in _MOTOR_USAGE
+        )
+
+    async_add_entities(entities)
+
+
+class BleBoxMetricSensor(BleBoxEntity, SensorEntity):
+    """Transport statistic of the device; sampled on every coordinator update."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: BleBoxCoordinator,
+        entry: ConfigEntry,
+        key: str,
+        name: str,
+        unit: str | None,
+        state_class: SensorStateClass,
+        enabled: bool,
+        value_fn: Callable[[TransportMetrics], float | None],
+    ) -> None:
+        super().__init__(coordinator, entry, context=("metrics", key))
+        self._value_fn = value_fn
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_name = name
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_entity_registry_enabled_default = enabled
+        self._attr_native_value = self._current_value()
+
+    @property
+    def available(self) -> bool:
+        # Still meaningful (timeouts, errors) while the device is unreachable
+        return True
+
+    def _current_value(self) -> float | None:
+        value = self._value_fn(self.coordinator.api.metrics)
+        return round(value) if value is not None else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        value = self._current_value()
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+
+class BleBoxHealthSensor(BleBoxEntity, SensorEntity):
+    """Connection health of the device: healthy, degraded or offline."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = HEALTH_STATES
+    _attr_name = "Connection health"
+
+    def __init__(self, coordinator: BleBoxCoordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator, entry, context=("health", None))
+        self._attr_unique_id = f"{entry.entry_id}_health"
+        self._attr_native_value = coordinator.api.health.state
+
+    @property
+    def available(self) -> bool:
+        # Reports the outage itself
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        state = self.coordinator.api.health.state
+        if state != self._attr_native_value:
+            self._attr_native_value = state
+            self.async_write_ha_state()
+
+
+class BleBoxMotorConfigSensor(BleBoxEntity, SensorEntity):
+    """
+    Static motor configuration (favorite, calibration, icon set).
+    Kept off the cover's attributes: updated only when the value itself changes.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: BleBoxCoordinator,
+        entry: ConfigEntry,
+        channel: int,
+        key: str,
+        name: str,
+        unit: str | None,
+        device_class: SensorDeviceClass | None,
+        enabled: bool,
+        value_fn: Callable[[MotorState], Any],
+    ) -> None:
+        super().__init__(coordinator, entry, context=("calibration", channel))
+        self._channel = channel
+        self._label = name
+        self._value_fn = value_fn
+        self._attr_unique_id = f"{entry.entry_id}_motor_{channel}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_entity_registry_enabled_default = enabled
+
+    def _motor(self) -> MotorState | None:
+        return self.coordinator.data.motors.get(self._channel)
+
+    @property
+    def name(self) -> str | None:
+        motor = self._motor()
+        return f"{(motor and motor.name) or f'Motor {self._channel}'} {self._label}"
+
+    @property
+    def native_value(self) -> Any:
+        motor = self._motor()
+        return self._value_fn(motor) if motor else None
+
+
+class BleBoxMotorUsageSensor(BleBoxEntity, SensorEntity):
+    """
+    Wear counter of one motor (cycles, travel, run time, ...), aggregated as the
+    states come in; total increasing, so long-term statistics sum it up cheaply.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(
+        self,
+        coordinator: BleBoxCoordinator,
+        entry: ConfigEntry,
+        channel: int,
+        key: str,
+        name: str,
+        unit: str | None,
+        device_class: SensorDeviceClass | None,
+        value_fn: Callable[[MotorUsage], Any],
+    ) -> None:
+        super().__init__(coordinator, entry, context=("usage", channel))
+        self._channel = channel
+        self._label = name
+        self._value_fn = value_fn
+        self._attr_unique_id = f"{entry.entry_id}_motor_{channel}_usage_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_native_value = value_fn(coordinator.usage.motor(channel))
+
+    @property
+    def name(self) -> str | None:
+        motor = self.coordinator.data.motors.get(self._channel)
+        return f"{(motor and motor.name) or f'Motor {self._channel}'} {self._label}"
+
+    @property
+    def available(self) -> bool:
+        # Totals stay valid while the device is unreachable
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        value = self._value_fn(self.coordinator.usage.motor(self._channel))
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
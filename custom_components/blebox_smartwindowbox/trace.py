@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+
+class MoveTrace:
+    """
+    Timeline of one set-position run: commands with their round-trip, every poll
+    with its latency and reported position, the stop decision and where the
+    motor came to rest. Times are seconds since the trace started.
+    """
+
+    def __init__(self, channel: int, target: int, mode: str) -> None:
+        self.channel = channel
+        self.target = target
+        self.mode = mode
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.monotonic()
+        self.events: list[dict[str, Any]] = []
+        self.result: dict[str, Any] = {}
+
+    def _t(self, at: float | None = None) -> float:
+        return round((time.monotonic() if at is None else at) - self._t0, 3)
+
+    def event(self, kind: str, at: float | None = None, **data: Any) -> None:
+        self.events.append({"t": self._t(at), "event": kind, **data})
+
+    def command(self, command: str, sent: float, acked: float) -> None:
+        self.events.append(
+            {
+                "t": self._t(sent),
+                "event": "command",
+                "command": command,
+                "ack_t": self._t(acked),
+                "latency_ms": round((acked - sent) * 1000.0, 1),
+            }
+        )
+
+    def poll(self, sampled_at: float | None, latency_s: float | None, position: int | None, state: int | None) -> None:
+        self.events.append(
+            {
+                "t": self._t(sampled_at),
+                "event": "poll",
+                "position": position,
+                "state": state,
+                "latency_ms": round(latency_s * 1000.0, 1) if latency_s is not None else None,
+            }
+        )
+
+    def finish(self, reached: bool | None, final_position: int | None) -> None:
+        self.result = {
+            "reached": reached,
+            "final_position": final_position,
+            "error": abs(final_position - self.target) if final_position is not None else None,
+            "duration_s": self._t(),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "target": self.target,
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(),
+            "result": self.result,
+            # Polls are stamped at their request midpoint, so they may interleave with later events
+            "events": sorted(self.events, key=lambda e: e["t"]),
+        }
+
+
+class _NullTrace(MoveTrace):
+    """Stand-in for untraced runs: records nothing."""
+
+    def __init__(self) -> None:
+        pass
+
+    def event(self, kind: str, at: float | None = None, **data: Any) -> None:
+        pass
+
+    def command(self, command: str, sent: float, acked: float) -> None:
+        pass
+
+    def poll(self, sampled_at: float | None, latency_s: float | None, position: int | None, state: int | None) -> None:
+        pass
+
+
+NULL_TRACE: MoveTrace = _NullTrace()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    TRAVEL_PROFILE_BANDS,
+    TRAVEL_LEARN_RATE,
+    TRAVEL_MAX_SEGMENT_SEC,
+    TRAVEL_SAVE_DELAY_SEC,
+)
+from .metrics import ewma
+from .models import MotorState
+
+STORAGE_VERSION = 1
+
+_BAND_PCT = 100.0 / TRAVEL_PROFILE_BANDS
+
+
+class VelocityProfile:
+    """Seconds per percent of travel for each position band, in one direction."""
+
+    __slots__ = ("sec_per_pct", "samples")
+
+    def __init__(self, default_sec_per_pct: float, sec_per_pct: list[float] | None = None, samples: int = 0) -> None:
+        if sec_per_pct is None or len(sec_per_pct) != TRAVEL_PROFILE_BANDS:
+            sec_per_pct = [default_sec_per_pct] * TRAVEL_PROFILE_BANDS
+        self.sec_per_pct = sec_per_pct
+        self.samples = samples
+
+    @staticmethod
+    def _band(pos: float) -> int:
+        return min(TRAVEL_PROFILE_BANDS - 1, max(0, int(pos // _BAND_PCT)))
+
+    def _segments(self, start: float, end: float) -> list[tuple[int, float]]:
+        """(band, distance) pieces of the travel between two positions."""
+        lo, hi = sorted((max(0.0, min(100.0, start)), max(0.0, min(100.0, end))))
+        pieces = []
+        while hi - lo > 1e-9:
+            band = self._band(lo)
+            band_end = min(hi, (band + 1) * _BAND_PCT)
+            pieces.append((band, band_end - lo))
+            lo = band_end
+        return pieces
+
+    def observe(self, start: float, end: float, seconds: float) -> None:
+        """Fold one observed segment into the bands it crossed."""
+        pieces = self._segments(start, end)
+        expected = sum(self.sec_per_pct[b] * d for b, d in pieces)
+        if not pieces or expected <= 0 or seconds <= 0:
+            return
+        # Scale every crossed band by how much slower/faster the segment was than predicted
+        ratio = seconds / expected
+        for band, _ in pieces:
+            self.sec_per_pct[band] = ewma(self.sec_per_pct[band], self.sec_per_pct[band] * ratio, TRAVEL_LEARN_RATE)
+        self.samples += 1
+
+    def travel_time(self, start: float, end: float) -> float:
+        return sum(self.sec_per_pct[b] * d for b, d in self._segments(start, end))
+
+    def position_after(self, start: float, seconds: float, direction: int) -> float:
+        """Where a motor starting at start ends up after moving `seconds` (direction -1 or +1)."""
+        pos = max(0.0, min(100.0, float(start)))
+        while seconds > 0:
+            if (direction > 0 and pos >= 100.0) or (direction < 0 and pos <= 0.0):
+                break
+            band = self._band(pos if direction > 0 else pos - 1e-9)
+            edge = (band + 1) * _BAND_PCT if direction > 0 else band * _BAND_PCT
+            dist = abs(edge - pos)
+            needed = dist * self.sec_per_pct[band]
+            if needed >= seconds:
+                return pos + direction * seconds / self.sec_per_pct[band]
+            pos = edge
+            seconds -= needed
+        return max(0.0, min(100.0, pos))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"sec_per_pct": [round(v, 5) for v in self.sec_per_pct], "samples": self.samples}
+
+
+class TravelModel:
+    """
+    Learned velocity profiles per motor and direction for one device.
+    Fed with (time, position) samples of every observed move and persisted in
+    Home Assistant storage, so estimates survive restarts without extra requests.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str | None) -> None:
+        self._store: Store | None = (
+            Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.travel") if entry_id else None
+        )
+        self._profiles: dict[str, VelocityProfile] = {}
+        self._stored: dict[str, Any] = {}
+        self._last: dict[int, tuple[float, int, int]] = {}  # channel -> (t, position, direction)
+
+    async def async_load(self) -> None:
+        if self._store is None:
+            return
+        data = await self._store.async_load() or {}
+        self._stored = data.get("profiles") or {}
+
+    async def async_remove(self) -> None:
+        if self._store is not None:
+            await self._store.async_remove()
+
+    @staticmethod
+    def _key(channel: int, direction: str) -> str:
+        return f"{channel}:{direction}"
+
+    def profile(self, motor: MotorState, direction: str) -> VelocityProfile:
+        key = self._key(motor.id, direction)
+        profile = self._profiles.get(key)
+        if profile is None:
+            stored = self._stored.get(key) or {}
+            profile = VelocityProfile(
+                motor.full_travel_time_s(direction) / 100.0,
+                stored.get("sec_per_pct"),
+                int(stored.get("samples", 0)),
+            )
+            self._profiles[key] = profile
+        return profile
+
+    def observe(self, motors: dict[int, MotorState], t: float) -> None:
+        """Feed one state sample (coordinator refresh or motion tick) taken at monotonic time t."""
+        changed = False
+        for channel, m in motors.items():
+            if not m.moving or m.current_pos is None:
+                self._last.pop(channel, None)
+                continue
+            sign = 1 if m.state == 0 else -1  # 0 closing (toward 100), 1 opening (toward 0)
+            last = self._last.get(channel)
+            if last is not None and last[2] == sign:
+                if t <= last[0] or m.current_pos == last[1]:
+                    continue  # older or repeated sample: keep the time the position was first seen
+                if t - last[0] <= TRAVEL_MAX_SEGMENT_SEC and (m.current_pos - last[1]) * sign > 0:
+                    direction = "closing" if sign > 0 else "opening"
+                    self.profile(m, direction).observe(last[1], m.current_pos, t - last[0])
+                    changed = True
+            self._last[channel] = (t, m.current_pos, sign)
+        if changed:
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, TRAVEL_SAVE_DELAY_SEC)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        profiles = dict(self._stored)
+        profiles.update({key: p.as_dict() for key, p in self._profiles.items()})
+        return {"profiles": profiles}
+
+    def as_dict(self) -> dict[str, Any]:
+        return self._data_to_save()["profiles"]
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, USAGE_MAX_GAP_SEC, USAGE_REVERSAL_WINDOW_SEC, USAGE_SAVE_DELAY_SEC
+from .models import MotorState
+
+STORAGE_VERSION = 1
+
+
+class MotorUsage:
+    """Running wear totals of one motor; every field only ever grows."""
+
+    __slots__ = (
+        "cycles",
+        "travel_opening_pct",
+        "travel_closing_pct",
+        "run_time_s",
+        "stops",
+        "reversals",
+        "rain_closes",
+    )
+
+    def __init__(self, stored: dict[str, Any] | None = None) -> None:
+        stored = stored or {}
+        self.cycles = int(stored.get("cycles", 0))
+        self.travel_opening_pct = float(stored.get("travel_opening_pct", 0.0))
+        self.travel_closing_pct = float(stored.get("travel_closing_pct", 0.0))
+        self.run_time_s = float(stored.get("run_time_s", 0.0))
+        self.stops = int(stored.get("stops", 0))
+        self.reversals = int(stored.get("reversals", 0))
+        self.rain_closes = int(stored.get("rain_closes", 0))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "travel_opening_pct": round(self.travel_opening_pct, 2),
+            "travel_closing_pct": round(self.travel_closing_pct, 2),
+            "run_time_s": round(self.run_time_s, 2),
+            "stops": self.stops,
+            "reversals": self.reversals,
+            "rain_closes": self.rain_closes,
+        }
+
+
+def _sign(m: MotorState) -> int:
+    """+1 closing (toward 100), -1 opening (toward 0), 0 idle."""
+    if m.state == 0:
+        return 1
+    if m.state == 1:
+        return -1
+    return 0
+
+
+class UsageStats:
+    """
+    Per-motor wear counters of one device, folded in from the state samples the
+    integration already takes (refreshes, motion ticks, command responses), so
+    no history has to be queried for them. Persisted in Home Assistant storage.
+
+    A cycle is one run of the motor (start to stop); a stop counts when a run
+    ends short of either end position; a reversal is a run in the opposite
+    direction started while moving or within USAGE_REVERSAL_WINDOW_SEC of a
+    stop mid-travel.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str | None) -> None:
+        self._store: Store | None = (
+            Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.usage") if entry_id else None
+        )
+        self._motors: dict[int, MotorUsage] = {}
+        self._stored: dict[str, Any] = {}
+        self._last: dict[int, tuple[float, int, int]] = {}  # channel -> (t, position, sign)
+        self._run_end: dict[int, tuple[float, int]] = {}  # channel -> (t, sign) of the last finished run
+
+    async def async_load(self) -> None:
+        if self._store is None:
+            return
+        data = await self._store.async_load() or {}
+        self._stored = data.get("motors") or {}
+
+    async def async_remove(self) -> None:
+        if self._store is not None:
+            await self._store.async_remove()
+
+    def motor(self, channel: int) -> MotorUsage:
+        usage = self._motors.get(channel)
+        if usage is None:
+            usage = self._motors[channel] = MotorUsage(self._stored.get(str(channel)))
+        return usage
+
+    def observe(self, motors: dict[int, MotorState], t: float) -> None:
+        """Fold in one state sample taken at monotonic time t; older samples are ignored."""
+        changed = False
+        for channel, m in motors.items():
+            pos = m.current_pos
+            if pos is None:
+                continue
+            sign = _sign(m)
+            last = self._last.get(channel)
+            if last is not None and t <= last[0]:
+                continue
+            self._last[channel] = (t, pos, sign)
+            if last is None:
+                continue  # first sample since startup: only the baseline
+            last_t, last_pos, last_sign = last
+            if (pos, sign) == (last_pos, last_sign) and not sign:
+                continue
+
+            usage = self.motor(channel)
+            delta = pos - last_pos
+            if delta > 0:
+                usage.travel_closing_pct += delta
+            elif delta < 0:
+                usage.travel_opening_pct -= delta
+            if last_sign:
+                # Polls are close together while moving; a longer gap (lost connection) is not all run time
+                usage.run_time_s += min(t - last_t, USAGE_MAX_GAP_SEC)
+
+            if sign and sign != last_sign:
+                if last_sign:
+                    # Turned around without being seen idle: the new run counts as the reversal
+                    self._run_end[channel] = (t, last_sign)
+                self._start_run(channel, usage, sign, t)
+            elif not sign and last_sign:
+                self._end_run(channel, usage, last_sign, t, pos)
+            elif not sign and delta:
+                # Moved between two idle samples (a timed move, or a short run between polls)
+                run_sign = 1 if delta > 0 else -1
+                usage.run_time_s += abs(delta) * m.full_travel_time_s("closing" if delta > 0 else "opening") / 100
+                self._start_run(channel, usage, run_sign, t)
+                self._end_run(channel, usage, run_sign, t, pos)
+            changed = True
+        if changed:
+            self._schedule_save()
+
+    def _start_run(self, channel: int, usage: MotorUsage, sign: int, t: float) -> None:
+        usage.cycles += 1
+        previous = self._run_end.get(channel)
+        if previous is not None and previous[1] != sign and t - previous[0] <= USAGE_REVERSAL_WINDOW_SEC:
+            usage.reversals += 1
+
+    def _end_run(self, channel: int, usage: MotorUsage, sign: int, t: float, pos: int) -> None:
+        if 0 < pos < 100:
+            usage.stops += 1
+            self._run_end[channel] = (t, sign)
+        else:
+            # Leaving an end position again is a new cycle, not a reversal
+            self._run_end.pop(channel, None)
+
+    def record_rain_close(self, channel: int) -> None:
+        self.motor(channel).rain_closes += 1
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, USAGE_SAVE_DELAY_SEC)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        motors = dict(self._stored)
+        motors.update({str(ch): usage.as_dict() for ch, usage in self._motors.items()})
+        return {"motors": motors}
+
+    def as_dict(self) -> dict[str, Any]:
+        return self._data_to_save()["motors"]
@@ -0,0 +1,189 @@
+"""
+Positioning benchmark against the local simulator.
+
+Drives BleBoxMotorCover.async_set_cover_position through a series of moves on a
+SimulatedWindowBox and reports, per move and aggregated:
+final position error, overshoot, time-to-target, HTTP requests per move and
+stop latency (STOP issued by the integration -> STOP acted on by the device).
+
+    python tools/benchmark_positioning.py --coast-ms 200 --latency-ms 40 --jitter-ms 15
+    python tools/benchmark_positioning.py --json results.json
+    python tools/benchmark_positioning.py --mode timed
+    python tools/benchmark_positioning.py --stall-pct 3 --no-hedge
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.blebox_smartwindowbox.api import BleBoxSmartWindowBoxApi  # noqa: E402
+from custom_components.blebox_smartwindowbox.const import CMD_STOP, MODE_CLOSED_LOOP, MODE_TIMED  # noqa: E402
+from custom_components.blebox_smartwindowbox.coordinator import BleBoxCoordinator  # noqa: E402
+from custom_components.blebox_smartwindowbox.cover import BleBoxMotorCover  # noqa: E402
+from simulator import SimulatedWindowBox  # noqa: E402
+
+DEFAULT_MOVES = (30, 70, 55, 10, 90, 45, 50, 20, 80, 35)
+SETTLE_SEC = 1.0
+
+
+async def _run_move(
+    cover: BleBoxMotorCover,
+    sim: SimulatedWindowBox,
+    channel: int,
+    target: int,
+    stop_calls: list[float],
+    mode: str,
+) -> dict[str, Any]:
+    start_pos = sim.position(channel)
+    requests_before = sum(sim.requests.values())
+    commands_before = len(sim.command_log)
+    stop_calls.clear()
+
+    started = time.monotonic()
+    await cover.async_set_cover_position(position=target, mode=mode)
+    elapsed = time.monotonic() - started
+    requests = sum(sim.requests.values()) - requests_before
+
+    # Let the motor coast out before measuring where it came to rest
+    await asyncio.sleep(SETTLE_SEC)
+    final = sim.position(channel)
+
+    direction = 1 if target > start_pos else -1
+    stops = [t for t, ch, cmd in sim.command_log[commands_before:] if ch == channel and cmd == CMD_STOP]
+    stop_latency = (stops[0] - stop_calls[0]) if stops and stop_calls else None
+
+    return {
+        "start": round(start_pos, 2),
+        "target": target,
+        "final": round(final, 2),
+        "error": round(abs(final - target), 2),
+        "overshoot": round(max(0.0, (final - target) * direction), 2),
+        "time_to_target_s": round(elapsed, 3),
+        "requests": requests,
+        "stop_latency_ms": round(stop_latency * 1000.0, 1) if stop_latency is not None else None,
+    }
+
+
+def _summary(results: list[dict[str, Any]]) -> dict[str, Any]:
+    def col(key: str) -> list[float]:
+        return [r[key] for r in results if r[key] is not None]
+
+    summary: dict[str, Any] = {"moves": len(results)}
+    for key in ("error", "overshoot", "time_to_target_s", "requests", "stop_latency_ms"):
+        values = col(key)
+        if values:
+            summary[key] = {
+                "mean": round(statistics.fmean(values), 3),
+                "max": round(max(values), 3),
+            }
+    return summary
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    sim = SimulatedWindowBox(
+        motors=1,
+        travel_up_ms=args.travel_ms,
+        travel_down_ms=args.travel_ms,
+        coast_ms=args.coast_ms,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+        stall_pct=args.stall_pct,
+        stall_ms=args.stall_ms,
+    )
+    address = await sim.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with aiohttp.ClientSession() as session:
+            api = BleBoxSmartWindowBoxApi(session=session, host=address, hedge_reads=not args.no_hedge)
+            coordinator = BleBoxCoordinator(hass, api)
+            await coordinator.async_refresh()
+
+            # Stand-in for the config entry; the entity only reads these fields
+            entry = SimpleNamespace(entry_id="benchmark", unique_id="benchmark", title="Benchmark", data={})
+            cover = BleBoxMotorCover(coordinator, entry, 0)  # type: ignore[arg-type]
+            cover.hass = hass
+
+            # Record when the integration issues STOP, to compare with device arrival
+            stop_calls: list[float] = []
+            send = api.send_motor_command
+
+            async def timed_send(channel: int, command: str) -> dict[str, Any]:
+                if command == CMD_STOP:
+                    stop_calls.append(time.monotonic())
+                return await send(channel, command)
+
+            api.send_motor_command = timed_send  # type: ignore[method-assign]
+
+            results = []
+            for target in args.moves:
+                result = await _run_move(cover, sim, 0, target, stop_calls, args.mode)
+                results.append(result)
+                if not args.quiet:
+                    print(
+                        f"{result['start']:6.1f} -> {target:3d}: final {result['final']:6.2f} "
+                        f"err {result['error']:5.2f} overshoot {result['overshoot']:5.2f} "
+                        f"t {result['time_to_target_s']:6.2f}s req {result['requests']:3d} "
+                        f"stop {result['stop_latency_ms']} ms"
+                    )
+
+            coordinator.motion.async_stop()
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+
+    await sim.stop()
+    return {
+        "settings": {
+            "travel_ms": args.travel_ms,
+            "coast_ms": args.coast_ms,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "stall_pct": args.stall_pct,
+            "stall_ms": args.stall_ms,
+            "hedge_reads": not args.no_hedge,
+            "mode": args.mode,
+        },
+        "moves": results,
+        "summary": _summary(results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--travel-ms", type=int, default=20000, help="full travel time (both directions)")
+    parser.add_argument("--coast-ms", type=float, default=150.0, help="motor run-on after STOP")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--stall-pct", type=float, default=0.0, help="share of device responses that stall")
+    parser.add_argument("--stall-ms", type=float, default=3000.0)
+    parser.add_argument("--no-hedge", action="store_true", help="do not hedge slow state reads")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mode", choices=[MODE_CLOSED_LOOP, MODE_TIMED], default=MODE_CLOSED_LOOP)
+    parser.add_argument("--moves", type=int, nargs="+", default=list(DEFAULT_MOVES))
+    parser.add_argument("--json", type=Path, help="write full results to this file")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    print(json.dumps(report["summary"], indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Load harness: hundreds of smartWindowBoxes driven from one Home Assistant event loop.
+
+Sets every box up like async_setup_entry does (own connection, API client,
+shared poll scheduler, coordinator, rain lane) and adds the real cover,
+binary_sensor and sensor entities through entity platforms, so state writes
+are part of the load. The simulated devices run on a separate thread with
+their own event loop: loop lag and CPU time below are the integration's alone.
+
+Reports, per phase (steady state, then every window moving at once):
+event-loop lag, main-thread CPU per coordinator refresh and per request,
+request rate and errors; plus memory per entity (tracemalloc, during setup).
+
+    python tools/load_harness.py --boxes 100 --motors 2
+    python tools/load_harness.py --boxes 200 --save-baseline baseline.json
+    python tools/load_harness.py --boxes 200 --baseline baseline.json   # exit 1 on regression
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import entity as entity_helper, entity_registry as er, translation  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform, current_platform  # noqa: E402
+
+from custom_components.blebox_smartwindowbox import binary_sensor, cover, sensor  # noqa: E402
+from custom_components.blebox_smartwindowbox.api import BleBoxSmartWindowBoxApi  # noqa: E402
+from custom_components.blebox_smartwindowbox.connection import DeviceConnection  # noqa: E402
+from custom_components.blebox_smartwindowbox.const import DEFAULT_RAIN_INTERVAL_SEC, DOMAIN  # noqa: E402
+from custom_components.blebox_smartwindowbox.coordinator import BleBoxCoordinator  # noqa: E402
+from custom_components.blebox_smartwindowbox.metrics import TransportMetrics  # noqa: E402
+from custom_components.blebox_smartwindowbox.rain import RainWatcher  # noqa: E402
+from custom_components.blebox_smartwindowbox.scheduler import PollScheduler  # noqa: E402
+from simulator import SimulatedWindowBox  # noqa: E402
+
+LAG_PROBE_SEC = 0.05
+PLATFORMS = {"cover": cover, "binary_sensor": binary_sensor, "sensor": sensor}
+
+# Compared against a baseline: (metric, absolute slack below which a change is noise). Lower is better for all.
+BASELINE_METRICS = (
+    ("steady.loop_lag_p99_ms", 2.0),
+    ("steady.cpu_ms_per_refresh", 0.2),
+    ("steady.requests_per_s", 1.0),
+    ("move.loop_lag_p99_ms", 5.0),
+    ("move.cpu_ms_per_request", 0.1),
+    ("move.duration_s", 0.5),
+    ("move.mean_error_pct", 0.5),
+    ("memory.cover_kib", 1.0),
+    ("memory.rain_kib", 1.0),
+)
+
+
+class DeviceLoop:
+    """The simulated devices, served from their own thread and event loop."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="simulated-devices", daemon=True)
+        self._thread.start()
+
+    def run(self, coro: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def call(self, coro: Any) -> Any:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class LagMonitor:
+    """Samples how late the loop wakes up a sleeper that asked for LAG_PROBE_SEC."""
+
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_SEC)
+            self.samples.append(max(0.0, time.perf_counter() - before - LAG_PROBE_SEC) * 1000.0)
+
+    def take(self) -> list[float]:
+        samples, self.samples = self.samples, []
+        return samples
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+class Box:
+    def __init__(self, index: int, sim: SimulatedWindowBox, address: str) -> None:
+        self.index = index
+        self.sim = sim
+        self.address = address
+        self.entry = SimpleNamespace(
+            entry_id=f"load{index:04d}",
+            unique_id=f"load{index:04d}",
+            title=f"Load {index}",
+            data={"host": address},
+            options={},
+        )
+        self.metrics = TransportMetrics()
+        self.connection: DeviceConnection | None = None
+        self.coordinator: BleBoxCoordinator | None = None
+        self.rain: RainWatcher | None = None
+        self.covers: list[cover.BleBoxMotorCover] = []
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _totals(boxes: list[Box]) -> tuple[int, int, int]:
+    """(coordinator refreshes, requests, errors + timeouts) over all boxes so far."""
+    refreshes = sum(b.metrics.refresh.count for b in boxes)
+    requests = sum(b.metrics.requests for b in boxes)
+    errors = sum(b.metrics.errors + b.metrics.timeouts for b in boxes)
+    return refreshes, requests, errors
+
+
+async def _measure(boxes: list[Box], lag: LagMonitor, work: Any) -> dict[str, Any]:
+    """Run work (a coroutine) and report what it cost the loop."""
+    lag.take()
+    refreshes0, requests0, errors0 = _totals(boxes)
+    cpu0 = time.thread_time()
+    started = time.monotonic()
+    await work
+    duration = time.monotonic() - started
+    cpu_ms = (time.thread_time() - cpu0) * 1000.0
+    refreshes, requests, errors = (n - n0 for n, n0 in zip(_totals(boxes), (refreshes0, requests0, errors0)))
+    samples = lag.take()
+    return {
+        "duration_s": round(duration, 2),
+        "loop_lag_p50_ms": round(_percentile(samples, 0.5) or 0.0, 2),
+        "loop_lag_p99_ms": round(_percentile(samples, 0.99) or 0.0, 2),
+        "loop_lag_max_ms": round(max(samples, default=0.0), 2),
+        "cpu_pct": round(cpu_ms / 10.0 / duration, 1),
+        "refreshes": refreshes,
+        "requests": requests,
+        "errors": errors,
+        "requests_per_s": round(requests / duration, 1),
+        "cpu_ms_per_refresh": round(cpu_ms / refreshes, 3) if refreshes else None,
+        "cpu_ms_per_request": round(cpu_ms / requests, 3) if requests else None,
+    }
+
+
+async def _setup_box(
+    hass: HomeAssistant, box: Box, scheduler: PollScheduler, memory: dict[str, list[int]], rain_interval: float
+) -> None:
+    # Same wiring as async_setup_entry
+    box.connection = DeviceConnection(box.metrics)
+    api = BleBoxSmartWindowBoxApi(session=box.connection.session, host=box.address, metrics=box.metrics)
+    scheduler.register(box.entry.entry_id)
+    box.coordinator = coordinator = BleBoxCoordinator(hass, api, scheduler, box.entry.entry_id)
+    await coordinator.async_config_entry_first_refresh()
+    hass.data[DOMAIN][box.entry.entry_id] = {"api": api, "connection": box.connection, "coordinator": coordinator}
+
+    for domain, module in PLATFORMS.items():
+        platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(module.__name__),
+            domain=domain,
+            platform_name=DOMAIN,
+            platform=module,  # type: ignore[arg-type]
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        current_platform.set(platform)
+        created: list[Any] = []
+        await module.async_setup_entry(hass, box.entry, created.extend)  # type: ignore[arg-type]
+        # One class at a time, so memory can be attributed per entity type
+        for cls in dict.fromkeys(type(e) for e in created):
+            group = [e for e in created if type(e) is cls]
+            before = tracemalloc.get_traced_memory()[0]
+            await platform.async_add_entities(group)
+            memory.setdefault(cls.__name__, []).append((tracemalloc.get_traced_memory()[0] - before) // len(group))
+        box.covers.extend(e for e in created if isinstance(e, cover.BleBoxMotorCover))
+
+    box.rain = RainWatcher(hass, box.entry, coordinator, rain_interval, [], scheduler)  # type: ignore[arg-type]
+    box.rain.start()
+
+
+async def _mass_move(boxes: list[Box], devices: DeviceLoop, rng: random.Random) -> dict[str, Any]:
+    targets = [(box, c, rng.randrange(0, 101)) for box in boxes for c in box.covers]
+    await asyncio.gather(*(c.async_set_cover_position(position=target) for _, c, target in targets))
+    await asyncio.sleep(1.0)  # coast out
+
+    async def _positions() -> list[float]:
+        return [box.sim.position(c._channel) for box, c, _ in targets]
+
+    finals = await devices.call(_positions())
+    errors = [abs(final - target) for final, (_, _, target) in zip(finals, targets)]
+    return {
+        "windows": len(targets),
+        "mean_error_pct": round(statistics.fmean(errors), 2),
+        "max_error_pct": round(max(errors), 2),
+    }
+
+
+async def run_load(args: argparse.Namespace) -> dict[str, Any]:
+    devices = DeviceLoop()
+    sims = [
+        SimulatedWindowBox(
+            motors=args.motors,
+            travel_up_ms=args.travel_ms,
+            travel_down_ms=args.travel_ms,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            device_id=f"load{i:04d}",
+            seed=args.seed + i,
+        )
+        for i in range(args.boxes)
+    ]
+    boxes = [Box(i, sim, devices.run(sim.start())) for i, sim in enumerate(sims)]
+    rng = random.Random(args.seed)
+    report: dict[str, Any] = {
+        "settings": {
+            "boxes": args.boxes,
+            "motors": args.motors,
+            "travel_ms": args.travel_ms,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "steady_sec": args.steady_sec,
+            "rain_interval": args.rain_interval,
+        }
+    }
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # The parts of bootstrap that adding entities relies on
+        translation.async_setup(hass)
+        entity_helper.async_setup(hass)
+        await er.async_load(hass)
+        hass.data[DOMAIN] = {}
+        scheduler = PollScheduler()
+        lag = LagMonitor()
+
+        memory: dict[str, list[int]] = {}
+        tracemalloc.start()
+        started = time.monotonic()
+        for box in boxes:
+            await _setup_box(hass, box, scheduler, memory, args.rain_interval)
+        setup_s = time.monotonic() - started
+        tracemalloc.stop()  # far too slow to keep on while measuring the loop
+        report["setup_s"] = round(setup_s, 2)
+        report["entities"] = {name: len(sizes) for name, sizes in memory.items()}
+        report["states"] = len(hass.states.async_all())
+        if not report["states"]:
+            raise SystemExit("No entity made it into the state machine; see the log above")
+        kib = {name: round(statistics.median(sizes) / 1024.0, 2) for name, sizes in memory.items()}
+        report["memory"] = {
+            "cover_kib": kib.get("BleBoxMotorCover"),
+            "rain_kib": kib.get("BleBoxRainBinarySensor"),
+            "per_entity_kib": kib,
+        }
+        if not args.quiet:
+            print(f"{args.boxes} boxes / {sum(len(b.covers) for b in boxes)} windows set up in {setup_s:.1f} s")
+
+        lag.start()
+        await asyncio.sleep(args.warmup_sec)
+        report["steady"] = await _measure(boxes, lag, asyncio.sleep(args.steady_sec))
+        if not args.quiet:
+            print("steady:", json.dumps(report["steady"]))
+
+        move: dict[str, Any] = {}
+
+        async def _move() -> None:
+            move.update(await _mass_move(boxes, devices, rng))
+
+        report["move"] = await _measure(boxes, lag, _move())
+        report["move"].update(move)
+        if not args.quiet:
+            print("move:  ", json.dumps(report["move"]))
+        lag.stop()
+
+        for box in boxes:
+            box.rain.async_stop()
+            await box.coordinator.async_shutdown()
+        await asyncio.sleep(1.0)  # let reads already on the wire finish before their sessions close
+        for box in boxes:
+            await box.connection.async_close()
+        await hass.async_stop(force=True)
+
+    for sim in sims:
+        devices.run(sim.stop())
+    devices.close()
+    report["device_requests"] = dict(sum((sim.requests for sim in sims), Counter()))
+    return report
+
+
+def _flatten(report: dict[str, Any]) -> dict[str, Any]:
+    return {
+        f"{section}.{key}": value
+        for section, values in report.items()
+        if isinstance(values, dict)
+        for key, value in values.items()
+        if not isinstance(value, dict)
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Metrics that got worse than baseline * (1 + tolerance) by more than their noise slack."""
+    if baseline.get("settings") != report["settings"]:
+        raise SystemExit(f"Baseline was recorded with different settings: {baseline.get('settings')}")
+    current, previous = _flatten(report), _flatten(baseline)
+    regressions = []
+    for metric, slack in BASELINE_METRICS:
+        now, before = current.get(metric), previous.get(metric)
+        if now is None or before is None:
+            continue
+        if now > before * (1.0 + tolerance) and now - before > slack:
+            regressions.append(f"{metric}: {before} -> {now}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boxes", type=int, default=100)
+    parser.add_argument("--motors", type=int, default=2, help="windows per box")
+    parser.add_argument("--travel-ms", type=int, default=8000, help="full travel time (both directions)")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--warmup-sec", type=float, default=5.0)
+    parser.add_argument("--steady-sec", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--rain-interval", type=float, default=DEFAULT_RAIN_INTERVAL_SEC, help="rain lane cadence (0: off, the default)"
+    )
+    parser.add_argument("--json", type=Path, help="write the full report to this file")
+    parser.add_argument("--save-baseline", type=Path, help="store this run as the baseline")
+    parser.add_argument("--baseline", type=Path, help="fail if this run regresses against the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    # Every box holds a listening socket plus both ends of its keep-alive connection
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, args.boxes * 8 + 256)), hard))
+
+    report = asyncio.run(run_load(args))
+    print(json.dumps({key: report[key] for key in ("setup_s", "memory", "steady", "move")}, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Local stand-in for a BleBox smartWindowBox.
+
+Serves /api/device/state, /api/window/extended/state and /s/{channel}/{u|d|s|f|n}
+with simulated motor physics derived from calibrationParameters, STOP coasting,
+response latency and jitter, and optionally stalled responses (a lost packet).
+
+    python tools/simulator.py --port 8080 --motors 2 --coast-ms 200 --latency-ms 40
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+# Same scale and state mapping as the real device: 0 = open, 100 = closed
+STATE_CLOSING = 0
+STATE_OPENING = 1
+STATE_IDLE = 2
+STATE_CLOSED = 3
+STATE_OPEN = 4
+
+NEXT_STEP_PCT = 25
+
+
+@dataclass
+class SimulatedMotor:
+    id: int
+    name: str
+    max_move_time_up_ms: int = 40000
+    max_move_time_down_ms: int = 40000
+    coast_ms: float = 150.0
+    fav_pos: int = 50
+    position: float = 0.0
+    target: float | None = None
+    direction: int = 0          # -1 opening (toward 0), +1 closing (toward 100), 0 idle
+    stop_at: float | None = None  # coasting until this monotonic time
+    updated: float = field(default_factory=time.monotonic)
+
+    def _speed(self, direction: int) -> float:
+        ms = self.max_move_time_up_ms if direction < 0 else self.max_move_time_down_ms
+        return 100.0 / (ms / 1000.0)
+
+    def advance(self, now: float) -> None:
+        if self.direction:
+            end = now if self.stop_at is None else min(now, self.stop_at)
+            dt = max(0.0, end - self.updated)
+            self.position += self.direction * self._speed(self.direction) * dt
+            reached_target = self.target is not None and (self.position - self.target) * self.direction >= 0
+            if reached_target:
+                self.position = self.target
+            if self.position <= 0.0 or self.position >= 100.0 or reached_target:
+                self.position = max(0.0, min(100.0, self.position))
+                self._halt()
+            elif self.stop_at is not None and now >= self.stop_at:
+                self._halt()
+        self.updated = now
+
+    def _halt(self) -> None:
+        self.direction = 0
+        self.target = None
+        self.stop_at = None
+
+    def move(self, now: float, direction: int, target: float | None = None) -> None:
+        self.advance(now)
+        self.direction = direction
+        self.target = target
+        self.stop_at = None
+
+    def stop(self, now: float) -> None:
+        self.advance(now)
+        if self.direction and self.stop_at is None:
+            self.stop_at = now + self.coast_ms / 1000.0
+
+    @property
+    def state(self) -> int:
+        if self.direction < 0:
+            return STATE_OPENING
+        if self.direction > 0:
+            return STATE_CLOSING
+        if self.position >= 100.0:
+            return STATE_CLOSED
+        if self.position <= 0.0:
+            return STATE_OPEN
+        return STATE_IDLE
+
+    def as_dict(self, extended: bool) -> dict[str, Any]:
+        pos = int(round(self.position))
+        desired = pos if self.target is None and not self.direction else (
+            int(round(self.target)) if self.target is not None else (0 if self.direction < 0 else 100)
+        )
+        data: dict[str, Any] = {
+            "id": self.id,
+            "state": self.state,
+            "currentPos": {"position": pos},
+            "desiredPos": {"position": desired},
+        }
+        if extended:
+            data.update(
+                {
+                    "name": self.name,
+                    "enabled": 1,
+                    "controlType": 1,
+                    "iconSet": 1,
+                    "favPos": {"position": self.fav_pos},
+                    "calibrationParameters": {
+                        "isCalibrated": 1,
+                        "maxMoveTimeUpMs": self.max_move_time_up_ms,
+                        "maxMoveTimeDownMs": self.max_move_time_down_ms,
+                    },
+                }
+            )
+        return data
+
+
+class SimulatedWindowBox:
+    def __init__(
+        self,
+        motors: int = 1,
+        travel_up_ms: int = 40000,
+        travel_down_ms: int = 40000,
+        coast_ms: float = 150.0,
+        latency_ms: float = 30.0,
+        jitter_ms: float = 10.0,
+        device_id: str = "sim0001",
+        seed: int | None = None,
+        stall_pct: float = 0.0,
+        stall_ms: float = 3000.0,
+    ) -> None:
+        self.motors = {
+            i: SimulatedMotor(
+                id=i,
+                name=f"Motor {i}",
+                max_move_time_up_ms=travel_up_ms,
+                max_move_time_down_ms=travel_down_ms,
+                coast_ms=coast_ms,
+            )
+            for i in range(motors)
+        }
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Share of responses held back by stall_ms, like a lost packet waiting for its retransmit
+        self.stall_pct = stall_pct
+        self.stall_ms = stall_ms
+        self.stalls = 0
+        self.device_id = device_id
+        self.rain = 0
+        self.rain_changed = time.monotonic()
+        self.requests: Counter[str] = Counter()
+        self.command_log: list[tuple[float, int, str]] = []  # (arrival, channel, command)
+        self._random = random.Random(seed)
+
+        self.app = web.Application()
+        self.app.router.add_get("/api/device/state", self._device_state)
+        self.app.router.add_get("/api/window/state", self._window_state)
+        self.app.router.add_get("/api/window/extended/state", self._extended_state)
+        self.app.router.add_get("/s/{channel}/{command}", self._command)
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+    # ---- helpers ----
+
+    async def _respond_delay(self) -> None:
+        delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if self.stall_pct and self._random.uniform(0.0, 100.0) < self.stall_pct:
+            self.stalls += 1
+            delay += self.stall_ms
+        await asyncio.sleep(max(0.0, delay) / 1000.0)
+
+    def _advance(self) -> float:
+        now = time.monotonic()
+        for m in self.motors.values():
+            m.advance(now)
+        return now
+
+    def set_rain(self, value: int) -> None:
+        if value != self.rain:
+            self.rain = value
+            self.rain_changed = time.monotonic()
+
+    def position(self, channel: int) -> float:
+        self._advance()
+        return self.motors[channel].position
+
+    def _window(self, extended: bool) -> dict[str, Any]:
+        now = self._advance()
+        window: dict[str, Any] = {"motors": [m.as_dict(extended) for m in self.motors.values()]}
+        window["sensors"] = [
+            {
+                "type": "rain",
+                "id": 0,
+                "value": self.rain,
+                "trend": 0,
+                "state": 0,
+                "elapsedTimeS": int(now - self.rain_changed),
+                "iconSet": 1,
+            }
+        ]
+        return {"window": window}
+
+    # ---- handlers ----
+
+    async def _device_state(self, request: web.Request) -> web.Response:
+        self.requests["/api/device/state"] += 1
+        await self._respond_delay()
+        return web.json_response(
+            {
+                "device": {
+                    "deviceName": "Simulated smartWindowBox",
+                    "type": "smartWindowBox",
+                    "apiLevel": "20180604",
+                    "hv": "sim",
+                    "fv": "0.0.0",
+                    "id": self.device_id,
+                    "ip": request.host.split(":")[0],
+                }
+            }
+        )
+
+    async def _window_state(self, request: web.Request) -> web.Response:
+        self.requests["/api/window/state"] += 1
+        await self._respond_delay()
+        return web.json_response(self._window(extended=False))
+
+    async def _extended_state(self, request: web.Request) -> web.Response:
+        self.requests["/api/window/extended/state"] += 1
+        await self._respond_delay()
+        return web.json_response(self._window(extended=True))
+
+    async def _command(self, request: web.Request) -> web.Response:
+        self.requests["/s/{channel}/{command}"] += 1
+        try:
+            channel = int(request.match_info["channel"])
+        except ValueError:
+            raise web.HTTPBadRequest()
+        motor = self.motors.get(channel)
+        command = request.match_info["command"]
+        if motor is None or command not in ("u", "d", "s", "f", "n"):
+            raise web.HTTPBadRequest()
+
+        # Latency is split: half before the device acts, half for the response
+        await asyncio.sleep(max(0.0, self.latency_ms / 2) / 1000.0)
+        now = time.monotonic()
+        self.command_log.append((now, channel, command))
+        if command == "u":
+            motor.move(now, -1)
+        elif command == "d":
+            motor.move(now, +1)
+        elif command == "s":
+            motor.stop(now)
+        elif command == "f":
+            motor.advance(now)
+            motor.move(now, -1 if motor.fav_pos < motor.position else 1, motor.fav_pos)
+        elif command == "n":
+            motor.advance(now)
+            if motor.direction:
+                motor.stop(now)
+            else:
+                step = -NEXT_STEP_PCT if motor.position >= 100.0 else NEXT_STEP_PCT
+                target = max(0.0, min(100.0, motor.position + step))
+                motor.move(now, -1 if step < 0 else 1, target)
+        await asyncio.sleep(max(0.0, self.latency_ms / 2) / 1000.0)
+        return web.json_response({"window": {"motors": [motor.as_dict(extended=False)]}})
+
+    # ---- lifecycle ----
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving; returns "host:port" for BleBoxSmartWindowBoxApi."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return f"{host}:{self.port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    sim = SimulatedWindowBox(
+        motors=args.motors,
+        travel_up_ms=args.travel_ms,
+        travel_down_ms=args.travel_ms,
+        coast_ms=args.coast_ms,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        stall_pct=args.stall_pct,
+        stall_ms=args.stall_ms,
+    )
+    address = await sim.start(args.host, args.port)
+    print(f"Simulated smartWindowBox listening on http://{address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--motors", type=int, default=1)
+    parser.add_argument("--travel-ms", type=int, default=40000)
+    parser.add_argument("--coast-ms", type=float, default=150.0)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--stall-pct", type=float, default=0.0, help="share of responses that stall")
+    parser.add_argument("--stall-ms", type=float, default=3000.0, help="how long a stalled response is held")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()